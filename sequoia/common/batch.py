@@ -9,16 +9,15 @@ from abc import ABC
 from collections import abc as collections_abc
 from collections import namedtuple
 from dataclasses import dataclass
-from functools import partial, singledispatch
+from functools import partial, wraps
 from typing import (Any, Callable, ClassVar, Dict, Generic, Iterable, Iterator,
                     KeysView, List, Mapping, NamedTuple, Optional, Sequence,
-                    Set, Tuple, Type, TypeVar, Union)
+                    Set, Tuple, Type, TypeVar, Union, get_type_hints)
 
 import gym
 import numpy as np
 import torch
 from gym import spaces
-from sequoia.utils.generic_functions import singledispatchmethod
 from sequoia.utils.logging_utils import get_logger
 from sequoia.utils.utils import zip_dicts
 from sequoia.utils.categorical import Categorical
@@ -34,6 +33,162 @@ def hasmethod(obj: Any, method_name: str) -> bool:
     return hasattr(obj, method_name) and callable(getattr(obj, method_name))
 
 
+_MISSING = object()
+
+# Types of numpy arrays which can be converted to Tensors with `torch.from_numpy`.
+_TORCH_COMPATIBLE_NUMPY_TYPES = frozenset([
+    np.bool_,
+    np.uint8,
+    np.int8,
+    np.int16,
+    np.int32,
+    np.int64,
+    np.float16,
+    np.float32,
+    np.float64,
+    np.complex64,
+    np.complex128,
+])
+
+
+def _memoized_property(method: Callable[[Any], V]) -> V:
+    """ Like a `property`, but the value is only computed once per instance.
+
+    Since Batch objects are frozen, the value is cached in the instance's `__dict__`
+    (under `_cached_<name>`) using `object.__setattr__`.
+    """
+    cache_key = f"_cached_{method.__name__}"
+
+    @wraps(method)
+    def _getter(self) -> V:
+        value = self.__dict__.get(cache_key, _MISSING)
+        if value is _MISSING:
+            value = method(self)
+            object.__setattr__(self, cache_key, value)
+        return value
+
+    return property(_getter)
+
+
+def _add_batch_dim(value: Any) -> Any:
+    """ Adds a batch dimension of size 1 to `value` (used in `with_batch_dimension`).
+    """
+    if value is None:
+        return value
+    if isinstance(value, (Tensor, np.ndarray, Categorical)):
+        return value[None]
+    return np.asarray([value])
+
+
+def _remove_batch_dim(value: Any) -> Any:
+    """ Removes the batch dimension of `value` (used in `remove_batch_dimension`). """
+    if value is None:
+        return value
+    return value[0]
+
+
+def _unbind(items: Any, batch_size: int) -> Sequence[Any]:
+    """ Splits `items` into a sequence of `batch_size` items, along the first dimension.
+
+    Tensors are split with `unbind` and ndarrays with `list`, which both give views,
+    rather than iterating over them in Python.
+    """
+    if items is None:
+        # If one of the fields is None, then we convert it into a list of Nones,
+        # so we can zip all the fields to create a list of tuples.
+        return [None] * batch_size
+    if isinstance(items, Tensor):
+        return items.unbind(0)
+    if isinstance(items, Batch):
+        return items.split()
+    return list(items)
+
+
+def _as_slice_if_contiguous(
+    mask: Union[np.ndarray, Tensor]
+) -> Union[slice, np.ndarray, Tensor]:
+    """ Returns a slice equivalent to the (1d) boolean mask `mask`, if it selects a
+    contiguous range of items. Otherwise, returns `mask` unchanged.
+
+    Indexing with a slice gives back views, while indexing with a mask (advanced
+    indexing) always makes a copy.
+
+    NOTE: Arrays of indices are left as-is, since they might be out of bounds, and
+    so are masks on a GPU, since finding the selected items would synchronize.
+    """
+    if mask.ndim != 1:
+        return mask
+    if isinstance(mask, Tensor):
+        if mask.dtype != torch.bool or mask.device.type != "cpu":
+            return mask
+        positions = np.flatnonzero(mask.numpy())
+    elif mask.dtype == bool:
+        positions = np.flatnonzero(mask)
+    else:
+        return mask
+    if len(positions) == 0:
+        return mask
+    start, stop = int(positions[0]), int(positions[-1]) + 1
+    if stop - start != len(positions):
+        return mask
+    return slice(start, stop)
+
+
+def _may_hold_batch(annotation: Any) -> bool:
+    """ Returns wether a field with the given (resolved) type annotation could hold a
+    Batch object. Returns True whenever this can't be determined.
+    """
+    if annotation is Any or isinstance(annotation, TypeVar):
+        return True
+    origin = getattr(annotation, "__origin__", None)
+    if origin is Union:
+        return any(_may_hold_batch(arg) for arg in annotation.__args__)
+    if origin is not None:
+        annotation = origin
+    if not isinstance(annotation, type):
+        return True
+    try:
+        return issubclass(annotation, Batch) or issubclass(Batch, annotation)
+    except TypeError:
+        return True
+
+
+def _make_map_function(cls: Type["Batch"]) -> Callable:
+    """ Generates a version of `Batch._map` specialized for the fields of `cls`.
+
+    The loop over the fields is unrolled, and the `isinstance(value, Batch)` check is
+    only kept for the fields whose annotation doesn't rule out a nested Batch.
+    """
+    try:
+        type_hints = get_type_hints(cls)
+    except Exception:
+        # Can't resolve some of the annotations (e.g. forward references).
+        type_hints = {}
+    lines = ["def _map(self, func, *args, recursive=True, **kwargs):"]
+    for i, field_name in enumerate(cls.field_names):
+        if field_name in type_hints and not _may_hold_batch(type_hints[field_name]):
+            lines.append(f"    v{i} = func(self.{field_name}, *args, **kwargs)")
+            continue
+        lines += [
+            f"    v{i} = self.{field_name}",
+            f"    if isinstance(v{i}, Batch):",
+            "        if recursive:",
+            f"            v{i} = v{i}._map(func, *args, recursive=True, **kwargs)",
+            "    else:",
+            f"        v{i} = func(v{i}, *args, **kwargs)",
+        ]
+    values = "".join(f"v{i}, " for i in range(len(cls.field_names)))
+    lines.append(f"    return self._fast_ctor(({values}))")
+    namespace: Dict[str, Any] = {}
+    code = compile("\n".join(lines), f"<batch_map:{cls.__qualname__}>", "exec")
+    exec(code, {"Batch": Batch}, namespace)
+    _map = namespace["_map"]
+    _map.__qualname__ = f"{cls.__qualname__}._map"
+    _map.__doc__ = Batch._map.__doc__
+    _map._generated = True
+    return _map
+
+
 @dataclass(frozen=True, eq=False)
 class Batch(ABC, Mapping[str, T]):
     """ Abstract base class for typed, immutable objects holding tensors.
@@ -134,9 +289,13 @@ class Batch(ABC, Mapping[str, T]):
     """
     # TODO: Would it make sense to add a gym Space class variable here? 
     space: ClassVar[Optional[gym.Space]]
-    # TODO: Remove these:
-    field_names: ClassVar[List[str]]
+    # NOTE: These get set on each subclass by `_finalize`, the first time an instance
+    # of that class is created.
+    field_names: ClassVar[Tuple[str, ...]]
+    _dc_fields: ClassVar[Tuple[dataclasses.Field, ...]]
     _namedtuple: ClassVar[Type[NamedTuple]]
+    _attrgetter: ClassVar[Callable[["Batch"], Tuple[Any, ...]]]
+    _has_post_init: ClassVar[bool]
 
     def __init_subclass__(cls, *args, **kwargs):
         # IDEA: By not marking 'Batch' a dataclass, we would let the subclass
@@ -147,16 +306,54 @@ class Batch(ABC, Mapping[str, T]):
             raise RuntimeError(f"{__class__} subclass {cls} must be a dataclass!")
         super().__init_subclass__(*args, **kwargs)
 
-    def __post_init__(self):
-        # Create some class attributes, if they don't already exist.
-        # TODO: We have to set these here because __init_subclass__ is called
-        # before the dataclasses package sets the 'fields' attribute, it seems.
-        cls = type(self)
-        if "field_names" not in cls.__dict__:
-            type(self).field_names = [f.name for f in dataclasses.fields(self)]
+    def __new__(cls, *args, **kwargs):
+        # NOTE: `__init_subclass__` is called before the dataclass decorator adds the
+        # fields to the class, so we create the class attributes lazily, once per
+        # class, the first time an instance is created.
+        if "_finalized" not in cls.__dict__:
+            cls._finalize()
+        return super().__new__(cls)
+
+    @classmethod
+    def _finalize(cls) -> None:
+        """ Creates the class attributes that depend on the fields of the dataclass.
+        """
+        # NOTE: `dataclasses.fields` validates and rebuilds a tuple on every call, so
+        # the fields are only retrieved once here.
+        cls._dc_fields = dataclasses.fields(cls)
+        cls.field_names = tuple(f.name for f in cls._dc_fields)
         # Create a NamedTuple type for this new subclass.
-        if "_named_tuple" not in cls.__dict__:
-            type(self)._namedtuple = namedtuple(type(self).__name__ + "Tuple", self.field_names)
+        cls._namedtuple = namedtuple(cls.__name__ + "Tuple", cls.field_names)
+        # Function that returns a tuple with the values of all the fields.
+        if len(cls.field_names) == 1:
+            # NOTE: `attrgetter` with a single attribute doesn't return a tuple.
+            getter = operator.attrgetter(cls.field_names[0])
+            cls._attrgetter = staticmethod(lambda obj: (getter(obj),))
+        elif cls.field_names:
+            cls._attrgetter = operator.attrgetter(*cls.field_names)
+        else:
+            cls._attrgetter = staticmethod(lambda obj: ())
+        # `_fast_ctor` skips `__init__`, so it can only be used if there's no
+        # `__post_init__` to run.
+        cls._has_post_init = hasattr(cls, "__post_init__")
+        if cls._map is Batch._map or getattr(cls._map, "_generated", False):
+            # Replace the generic `_map` (or the one generated for a parent class)
+            # with one generated for the fields of `cls`, unless it is overwritten.
+            cls._map = _make_map_function(cls)
+        cls._finalized = True
+
+    @classmethod
+    def _fast_ctor(cls: Type[B], values: Iterable[Any]) -> B:
+        """ Creates an instance of `cls` from the values of all its fields (in order).
+
+        This bypasses the keyword arguments of the dataclass `__init__` and sets all the
+        attributes at once in the new object's `__dict__`.
+        """
+        if cls._has_post_init:
+            return cls(**dict(zip(cls.field_names, values)))
+        obj = cls.__new__(cls)
+        obj.__dict__.update(zip(cls.field_names, values))
+        return obj
 
     def __iter__(self) -> Iterator[str]:
         """ Yield the 'keys' of this object, i.e. the names of the fields. """
@@ -167,48 +364,44 @@ class Batch(ABC, Mapping[str, T]):
         return len(self.field_names)
     
     def __eq__(self, other: Union["Batch", Any]) -> bool:
-        # Not sure this is useful.
-        return NotImplemented
-    
-        if not isinstance(other, Batch):
-            return NotImplemented
-        if type(self) != type(other):
-            # Not allowing these sorts of comparisons.
-            return NotImplemented
-        items_equal = {
-            k: v == other[k]
-            for k, v in self.items()
-        }
-        return all(
-            is_equal.all() if isinstance(is_equal, (Tensor, np.ndarray)) else is_equal
-            for is_equal in items_equal.values()
-        )
-        
-        
-    @singledispatchmethod
+        # NOTE: Comparing the values of the fields would be ambiguous for tensors /
+        # arrays, so two Batch objects are only equal if they are the same object.
+        return self is other
+
     def __getitem__(self, index: Any) -> T:
         """ Select a subset of the fields of this object. Can also be indexed
         with tuples, boolean numpy arrays or tensors, as well as None. 
+
+        NOTE: When indexing with a (CPU) boolean mask that selects a contiguous range
+        of items, the fields are views of the original fields (like when indexing
+        with a slice), so writing to them in-place also changes this object.
+        """
+        # NOTE: Dispatching on the exact type of the index with a dict lookup, rather
+        # than with a singledispatchmethod, since this gets called very often.
+        getitem = self._getitem_dispatch.get(type(index), Batch._getitem_slow)
+        return getitem(self, index)
+
+    def _getitem_slow(self, index: Any) -> T:
+        """ Fallback used when the type of the index isn't in `_getitem_dispatch`, for
+        example when it is a subclass of one of the supported types.
         """
+        for index_type, getitem in self._getitem_dispatch.items():
+            if isinstance(index, index_type):
+                return getitem(self, index)
         raise KeyError(index)
-    
-    @__getitem__.register(type(None))
+
     def _getitem_none(self, index: None) -> "Batch":
         """ Indexing with 'None' gives back a copy with all the items having an
         extra batch dimension.
         """
         return self.with_batch_dimension()
-        return getattr(self, index)
 
-    @__getitem__.register
     def _getitem_by_name(self, index: str) -> Union[Tensor, Any]:
         return getattr(self, index)
 
-    @__getitem__.register
     def _getitem_by_index(self, index: int) -> Union[Tensor, Any]:
         return getattr(self, self.field_names[index])
 
-    @__getitem__.register(slice)
     def _getitem_with_slice(self, index: slice) -> "Batch":
         # NOTE: I don't think it would be a good idea to support slice indexing,
         # as it could be confusing and give the user the impression that it
@@ -217,24 +410,19 @@ class Batch(ABC, Mapping[str, T]):
         raise NotImplementedError(
             "Batch objects don't support indexing with (just) slices atm."
         )
-        if index == slice(None, None, None) or index == slice(0, len(self), 1):
-            return self
 
-    @__getitem__.register(type(Ellipsis))
-    def _(self: B, index) -> B:
+    def _getitem_ellipsis(self: B, index) -> B:
         return self
 
-    @__getitem__.register(np.ndarray)
-    @__getitem__.register(Tensor)
     def _getitem_with_array(self, index: np.ndarray) -> B:
         """
         NOTE: Indexing with just an array uses the array as a 'mask' on all
         fields, instead of indexing the "keys" of this object.
         """
         assert len(index) == self.batch_size
-        return self[:, index]
+        # Index with a slice when possible, so the fields are views, not copies.
+        return self[:, _as_slice_if_contiguous(index)]
     
-    @__getitem__.register(tuple)
     def _getitem_with_tuple(self, index: Tuple[Union[slice, Tensor, np.ndarray, int], ...]):
         """ When slicing with a tuple, if the first item is an integer, we get
         the attribute at that index and slice it with the rest.
@@ -278,6 +466,17 @@ class Batch(ABC, Mapping[str, T]):
             f"tuple item for now. (index={index})"
         )
 
+    _getitem_dispatch: ClassVar[Dict[type, Callable[["Batch", Any], Any]]] = {
+        type(None): _getitem_none,
+        str: _getitem_by_name,
+        int: _getitem_by_index,
+        slice: _getitem_with_slice,
+        type(Ellipsis): _getitem_ellipsis,
+        np.ndarray: _getitem_with_array,
+        Tensor: _getitem_with_array,
+        tuple: _getitem_with_tuple,
+    }
+
     def slice(self: B, index: Union[int, slice, np.ndarray, Tensor]) -> B:
         """ Gets a slice across the first (batch) dimension.
         Raises an error if there is no batch size.
@@ -297,11 +496,6 @@ class Batch(ABC, Mapping[str, T]):
         if isinstance(index, int):
             sliced_value = sliced_value.with_batch_dimension()
         return sliced_value
-        # return type(self)(**{
-        #     k: v.slice(index) if isinstance(v, Batch) else
-        #     v[index] if v is not None else None
-        #     for k, v in self.items()
-        # })
 
     def __setitem__(self, index: Union[int, str], value: Any):
         """ Set a value in slices of one or more of the fields.
@@ -313,23 +507,41 @@ class Batch(ABC, Mapping[str, T]):
         if not isinstance(index, tuple) or len(index) < 2:
             raise NotImplementedError("index needs to be tuple with len >= 2")
         # Get which keys/fields were selected:
-        selected_fields = np.array(self.field_names)[index[0]]
+        selected_fields = self._select_field_names(index[0])
         for selected_field in selected_fields:
             item = self[selected_field]
             if item is not None:
                 item[index[1:]] = value
 
+    def _select_field_names(
+        self, field_index: Union[int, slice, Sequence[int], np.ndarray, Tensor]
+    ) -> Sequence[str]:
+        """ Returns the names of the fields selected by `field_index`, using the same
+        semantics as when indexing a numpy array of the field names.
+        """
+        index_type = type(field_index)
+        if index_type is int:
+            return (self.field_names[field_index],)
+        if index_type is slice:
+            return self.field_names[field_index]
+        if isinstance(field_index, Tensor):
+            field_index = field_index.cpu().numpy()
+        if isinstance(field_index, np.ndarray) and field_index.dtype == bool:
+            return tuple(itertools.compress(self.field_names, field_index))
+        if isinstance(field_index, np.ndarray) and field_index.ndim == 0:
+            return (self.field_names[field_index],)
+        return tuple(self.field_names[i] for i in field_index)
+
     def keys(self) -> KeysView[str]:
         return KeysView(self.field_names)
 
     def values(self) -> Tuple[T, ...]:
-        return self.as_namedtuple()
+        return self.as_tuple()
 
     def items(self) -> Iterable[Tuple[str, T]]:
-        for name in self.field_names:
-            yield name, getattr(self, name)
+        return zip(self.field_names, self._attrgetter(self))
 
-    @property
+    @_memoized_property
     def devices(self) -> Dict[str, Union[Optional[torch.device], Dict]]:
         """ Dict from field names to their device if they have one, else None.
         
@@ -340,7 +552,7 @@ class Batch(ABC, Mapping[str, T]):
             for k, v in self.items()
         }
 
-    @property
+    @_memoized_property
     def device(self) -> Optional[torch.device]:
         """Returns the device common to all items, or `None`.
 
@@ -369,7 +581,7 @@ class Batch(ABC, Mapping[str, T]):
                 return None
         return device
 
-    @property
+    @_memoized_property
     def dtypes(self) -> Dict[str, Union[Optional[torch.dtype], Dict]]:
         """ Dict from field names to their dtypes if they have one, else None.
         
@@ -380,7 +592,7 @@ class Batch(ABC, Mapping[str, T]):
             for k, v in self.items()
         }
 
-    @property
+    @_memoized_property
     def dtype(self) -> Tuple[Optional[torch.dtype]]:
         """Returns the dtype common to all tensors, or None.
 
@@ -402,42 +614,42 @@ class Batch(ABC, Mapping[str, T]):
         return dtype
 
     def as_namedtuple(self) -> Tuple[T, ...]:
-        return self._namedtuple(**{
-            k: v for k, v in self.items()
-        })
+        return self._namedtuple._make(self._attrgetter(self))
     
     def as_list_of_tuples(self) -> Iterable[Tuple[T, ...]]:
         """Returns an iterable of the items in the 'batch', each item as a
         namedtuple (list of tuples).
         """
-        # If one of the fields is None, then we convert it into a list of Nones,
-        # so we can zip all the fields to create a list of tuples.
-        field_items = [
-            [items for _ in range(self.batch_size)] if items is None or items is {} else
-            [item for item in items]
-            for items in self.as_tuple()
-        ]
-        assert all([len(items) == self.batch_size for items in field_items])
-        return list(itertools.starmap(self._namedtuple, zip(*field_items)))
+        # NOTE: `zip` and `map` build the tuples without any intermediate lists, and
+        # without indexing the fields in Python for each item.
+        return list(map(self._namedtuple._make, zip(*self.as_namedtuple_of_views())))
+
+    def as_namedtuple_of_views(self) -> Tuple[Sequence[T], ...]:
+        """Returns a namedtuple where each field is a sequence with the items of that
+        field in the 'batch', i.e. the transpose of `as_list_of_tuples`.
+
+        The items are views (e.g. from `Tensor.unbind`) rather than copies, and no
+        tuple is created per item.
+        """
+        batch_size = self.batch_size
+        field_items = [_unbind(items, batch_size) for items in self._attrgetter(self)]
+        assert all([len(items) == batch_size for items in field_items])
+        return self._namedtuple._make(field_items)
 
     def as_tuple(self) -> Tuple[T, ...]:
-        """Returns a namedtuple containing the 'batched' attributes of this
+        """Returns a tuple containing the 'batched' attributes of this
         object (tuple of lists).
+
+        NOTE: Use `as_namedtuple` to get a namedtuple instead.
         """
-        # TODO: Turning on the namedtuple return value by default.
-        # return tuple(
-        #     getattr(self, f.name) for f in dataclasses.fields(self)
-        # )
-        return self.as_namedtuple()
-
-    # def as_dict(self) -> Dict[str, T]:
-    #     # NOTE: dicts are ordered since python 3.7
-    #     return {
-    #         field_name: getattr(self, field_name)
-    #         for field_name in self.field_names
-    #     }
+        return self._attrgetter(self)
 
     def to(self, *args, **kwargs):
+        values = self._attrgetter(self)
+        if all(isinstance(value, Tensor) for value in values):
+            # Fast path for the (most common) case where all the items are tensors.
+            return self._fast_ctor([value.to(*args, **kwargs) for value in values])
+
         def _to(item, *args_, **kwargs_):
             if hasattr(item, "to") and callable(item.to):
                 return item.to(*args_, **kwargs_)
@@ -470,10 +682,6 @@ class Batch(ABC, Mapping[str, T]):
                 return v.detach().cpu().numpy()
             return v
         return self._map(_numpy, recursive=True)
-        # return type(self)(**{
-        #     k: v.detach().cpu().numpy() if isinstance(v, (Tensor, Batch)) else v
-        #     for k, v in self.items()
-        # })
 
     def detach(self):
         """Returns a new Batch object of the same type, with all Tensors
@@ -484,11 +692,12 @@ class Batch(ABC, Mapping[str, T]):
         Batch
             New object of the same type, but with all tensors detached.
         """
+        values = self._attrgetter(self)
+        if all(isinstance(value, Tensor) for value in values):
+            # Fast path for the (most common) case where all the items are tensors.
+            return self._fast_ctor([value.detach() for value in values])
         from sequoia.utils.generic_functions import detach
         return self._map(detach)
-        # return type(self)(**detach({
-        #     k: v.detach() if isinstance(v, (Tensor, Batch)) else v for k, v in self.items()
-        # }))
 
     def cpu(self, **kwargs):
         """Returns a new Batch object of the same type, with all Tensors
@@ -501,18 +710,21 @@ class Batch(ABC, Mapping[str, T]):
         """
         return self.to(device="cpu", **kwargs)
 
-    def cuda(self, device=None, **kwargs):
+    def cuda(self, device=None, non_blocking: bool = True, **kwargs):
         """Returns a new Batch object of the same type, with all Tensors
         moved to cuda device.
 
+        NOTE: The copies are non-blocking by default, which only makes a difference
+        for tensors that are in pinned memory.
+
         Returns
         -------
         Batch
             New object of the same type, but with all tensors moved to cuda.
         """
-        return self.to(device=(device or "cuda"), **kwargs)
+        return self.to(device=(device or "cuda"), non_blocking=non_blocking, **kwargs)
 
-    @property
+    @_memoized_property
     def shapes(self) -> Dict[str, Union[torch.Size, Dict]]:
         """ Dict from field names to their shapes if they have one, else None.
         
@@ -523,7 +735,7 @@ class Batch(ABC, Mapping[str, T]):
             for k, v in self.items()
         }
 
-    @property
+    @_memoized_property
     def batch_size(self) -> Optional[int]:
         """ Returns the length of the first dimension if it is common to all
         tensors in this object, else None.
@@ -559,19 +771,7 @@ class Batch(ABC, Mapping[str, T]):
         extra `batch` dimension of size 1.
         """
         # TODO: Do we 'wrap' the `None` values? or keep them as-is?
-        @singledispatch
-        def unsqueeze(v: Any) -> Any:
-            if v is None:
-                return v
-            return np.asarray([v])
-
-        @unsqueeze.register(Categorical)
-        @unsqueeze.register(np.ndarray)
-        @unsqueeze.register(Tensor)
-        def _unsqueeze_array(v: Union[np.ndarray, Tensor, Categorical]) -> Union[np.ndarray, Tensor, Categorical]:
-            return v[None]
-
-        return self._map(unsqueeze)
+        return self._map(_add_batch_dim)
 
     def remove_batch_dimension(self: B) -> B:
         """ Returns a copy of `self` where all numpy arrays / tensors have an
@@ -580,15 +780,19 @@ class Batch(ABC, Mapping[str, T]):
         Raises an error if any non-None value doesn't have a batch dimension of
         size 1. 
         """
-        return self[:, 0]
+        # NOTE: Equivalent to `self[:, 0]`, without going through the tuple indexing.
+        return self._map(_remove_batch_dim)
 
     def split(self: B) -> List[B]:
         """Returns an iterable of the items in the 'batch', each item as a
         object of the same type as `self`.
         """
-        # If one of the fields is None, then we convert it into a list of Nones,
-        # so we can zip all the fields to create a list of tuples.
-        return [self[:, i] for i in range(self.batch_size)]
+        # NOTE: Equivalent to `[self[:, i] for i in range(self.batch_size)]`, but each
+        # field is split only once (e.g. with `Tensor.unbind`), rather than indexed
+        # `batch_size` times.
+        batch_size = self.batch_size
+        field_items = [_unbind(items, batch_size) for items in self._attrgetter(self)]
+        return [self._fast_ctor(values) for values in zip(*field_items)]
 
     @classmethod
     def stack(cls: Type[B], items: List[B]) -> B:
@@ -612,6 +816,22 @@ class Batch(ABC, Mapping[str, T]):
         NOTE: This is the opposite of `self.numpy()`
         """
         def _from_numpy(v: Union[np.ndarray, Any]) -> Union[Tensor, Any]:
+            if v is None:
+                return v
+            if isinstance(v, Tensor):
+                if device is None and dtype is None:
+                    return v
+                return v.to(device=device, dtype=dtype)
+            if isinstance(v, np.ndarray):
+                if v.dtype.type not in _TORCH_COMPATIBLE_NUMPY_TYPES:
+                    # e.g. arrays with dtype=object are left as-is.
+                    return v
+                # NOTE: `from_numpy` shares the memory of the ndarray.
+                tensor = torch.from_numpy(v)
+                if device is None and dtype is None:
+                    return tensor
+                return tensor.to(device=device, dtype=dtype)
+            # Other values (e.g. python scalars or lists).
             try:
                 return torch.as_tensor(v, device=device, dtype=dtype)
             except (TypeError, RuntimeError):
@@ -628,18 +848,20 @@ class Batch(ABC, Mapping[str, T]):
         `kwargs`) to all its values, (inluding the values of nested `Batch`
         objects if `recursive` is True). 
         """
-        new_items = {}
-        for key, value in self.items():
+        new_values = []
+        for value in self._attrgetter(self):
             if isinstance(value, Batch):
                 if not recursive:
                     # don't apply the function to nested Batch objects unless
                     # `recursive` is True.
-                    new_items[key] = value
+                    new_values.append(value)
                 else:
-                    new_items[key] = value._map(func, *args, recursive=recursive, **kwargs)
+                    new_values.append(
+                        value._map(func, *args, recursive=recursive, **kwargs)
+                    )
             else:
-                new_items[key] = func(value, *args, **kwargs)  # type: ignore
-        return type(self)(**new_items)
+                new_values.append(func(value, *args, **kwargs))  # type: ignore
+        return self._fast_ctor(new_values)
 
     def _apply(self: B,
                func: Callable[[T, Any], None],
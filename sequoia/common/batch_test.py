@@ -489,3 +489,95 @@ def test_slicing_with_one_item():
         "x": torch.Size([1, 5]),
         "task_labels": torch.Size([1]),
     }
+
+
+def test_properties_are_memoized():
+    """ The properties that depend on all the fields (batch_size, device, etc) are
+    only computed once per instance, since Batch objects are frozen.
+    """
+    observations = Observations(
+        x=torch.arange(10).reshape([2, 5]), task_labels=torch.arange(2, dtype=int),
+    )
+    assert observations.batch_size == 2
+    assert observations.shapes is observations.shapes
+    assert observations.device is observations.device
+    # The values are cached per instance, not per class.
+    other = Observations(x=torch.arange(3), task_labels=None)
+    assert other.batch_size == 3
+    assert observations.batch_size == 2
+
+
+@pytest.mark.parametrize(
+    "mask, expect_view",
+    [
+        (np.array([False, True, True, False, False]), True),
+        (torch.as_tensor([False, True, True, False, False]), True),
+        (np.array([True, False, True, False, False]), False),
+        # Arrays of indices are never converted to slices.
+        (torch.arange(5), False),
+        (np.arange(5)[::-1].copy(), False),
+    ],
+)
+def test_indexing_with_contiguous_mask_gives_views(mask, expect_view: bool):
+    """ Indexing with a mask (or indices) that select a contiguous range of items
+    gives views of the original tensors, rather than copies.
+    """
+    observations = Observations(x=torch.arange(25).reshape([5, 5]))
+    selected = observations[mask]
+    assert (selected.x == observations.x[mask]).all()
+    shares_memory = selected.x.storage().data_ptr() == observations.x.data_ptr()
+    assert shares_memory == expect_view
+
+
+def test_map_is_generated_for_each_class():
+    """ `_map` is replaced with a function generated for the fields of each class,
+    which should give the same results as the generic implementation.
+    """
+    obj = ForwardPass(
+        observations=Observations(x=torch.arange(10).reshape([2, 5])),
+        h_x=torch.arange(8).reshape([2, 4]),
+        actions=Actions(y_pred=torch.arange(2, dtype=int),),
+    )
+    assert ForwardPass._map is not Batch._map
+    # Subclasses get their own `_map`, rather than the one generated for the parent.
+    RLActions(y_pred=torch.arange(3), action_dist=Categorical(logits=torch.ones(3, 2)))
+    assert Actions._map is not RLActions._map
+
+    def _double(value):
+        return value * 2 if value is not None else value
+
+    expected = Batch._map(obj, _double)
+    assert str(obj._map(_double)) == str(expected)
+    assert obj._map(_double, recursive=False).observations is obj.observations
+
+
+def test_as_namedtuple_of_views():
+    observations = Observations(
+        x=torch.arange(10).reshape([2, 5]), task_labels=torch.arange(2, dtype=int),
+    )
+    views = observations.as_namedtuple_of_views()
+    assert len(views.x) == len(views.task_labels) == 2
+    # The items are views of the original tensors, not copies.
+    assert views.x[1].data_ptr() == observations.x[1].data_ptr()
+    assert str(list(zip(*views))) == str(observations.as_list_of_tuples())
+
+
+def test_out_of_range_indices_raise_an_error():
+    """ Indexing with contiguous but out-of-range indices raises an IndexError, rather
+    than giving back a truncated batch.
+    """
+    observations = Observations(x=torch.arange(5))
+    with pytest.raises(IndexError):
+        observations[:, np.arange(3, 7)]
+
+
+def test_to_with_non_blocking_and_a_distribution():
+    """ Keyword arguments like `non_blocking` can be passed to `to` when one of the
+    fields is a distribution.
+    """
+    actions = RLActions(
+        y_pred=torch.arange(3), action_dist=Categorical(logits=torch.ones(3, 2))
+    )
+    moved = actions.to(device="cpu", non_blocking=True)
+    assert moved.action_dist.device == torch.device("cpu")
+    assert (moved.action_dist.logits == actions.action_dist.logits).all()
@@ -18,6 +18,8 @@ class ActionCounter(IterableWrapper):
     def __init__(self, env: gym.Env):
         super().__init__(env=env)
         self._action_counter: int = 0
+        # Number of actions performed at each step.
+        self._increment: int = self.env.num_envs if self.is_vectorized else 1
 
     def step_count(self) -> int:
         return self._action_counter
@@ -27,7 +29,7 @@ class ActionCounter(IterableWrapper):
 
     def step(self, action):
         obs, reward, done, info = self.env.step(action)
-        self._action_counter += self.env.num_envs if self.is_vectorized else 1
+        self._action_counter += self._increment
         return obs, reward, done, info
 
 
@@ -57,16 +59,20 @@ class ActionLimit(ActionCounter):
         return f"Env reached max number of steps ({self._max_steps})"
 
     def step(self, action):
-        if self._action_counter >= self._max_steps:
+        max_steps = self._max_steps
+        action_counter = self._action_counter
+        if action_counter >= max_steps:
             raise ClosedEnvironmentError(
-                f"Env reached max number of steps ({self._max_steps})"
+                f"Env reached max number of steps ({max_steps})"
             )
 
-        obs, reward, done, info = super().step(action)
-        # logger.debug(f"(step {self._action_counter}/{self._max_steps})")
+        # NOTE: Not calling `super().step`, so the counter is only checked here.
+        obs, reward, done, info = self.env.step(action)
+        action_counter += self._increment
+        self._action_counter = action_counter
 
         # BUG: If we dont use >=, then iteration with EnvDataset doesn't work.
-        if self._action_counter >= self._max_steps:
+        if action_counter >= max_steps:
             self.close()
             # done = True
             # info["truncated"] = True
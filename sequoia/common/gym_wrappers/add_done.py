@@ -2,7 +2,7 @@
 """
 from dataclasses import dataclass, is_dataclass, replace
 from functools import singledispatch
-from typing import Any, Dict, Sequence, Tuple, TypeVar, Union
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 import gym
 import numpy as np
@@ -118,8 +118,14 @@ class AddDoneToObservation(IterableWrapper):
     NOTE: NEVER use this *BEFORE* batching, because of how the 'reset' works in
     all VectorEnvs, the observations will always be the 'new' ones, so `done`
     (in the obs) will always be False!
+
+    When `reuse_done_buffer` is True and the env is vectorized, the `done` array put
+    in the observations is a buffer that gets overwritten at each step, rather than a
+    new array. Only use this if the observations aren't kept around between steps.
     """
-    def __init__(self, env: gym.Env, done_space: Space = None):
+    def __init__(
+        self, env: gym.Env, done_space: Space = None, reuse_done_buffer: bool = False
+    ):
         super().__init__(env)
         # boolean value. (0 or 1)
         if done_space is None:
@@ -129,17 +135,38 @@ class AddDoneToObservation(IterableWrapper):
                 done_space = batch_space(done_space, self.env.num_envs)
         self.done_space = done_space
         self.observation_space = add_done(self.env.observation_space, self.done_space)
-
+        # Handler of `add_done` for the type of the observations, resolved once (when
+        # the first observation is received) rather than on every step.
+        self._observation_type: Optional[Type] = None
+        self._add_done_to_observation: Callable[[Any, Any], Any] = add_done
+        self._done_buffer: Optional[np.ndarray] = None
+        if reuse_done_buffer and self.is_vectorized:
+            self._done_buffer = np.zeros(self.env.num_envs, dtype=np.bool_)
+        # Value of `done` to add to the observations from `reset`.
+        self._reset_done: Union[bool, np.ndarray] = False
+        if self.is_vectorized:
+            self._reset_done = self.done_space.low.copy()
+
+    def _add_done(self, observation: Any, done: Any) -> Any:
+        observation_type = type(observation)
+        if observation_type is np.ndarray:
+            # Fast path for the most common case (e.g. Box observation spaces), same as
+            # `_add_done_to_array_obs`.
+            return {"x": observation, "done": done}
+        if observation_type is not self._observation_type:
+            self._add_done_to_observation = add_done.dispatch(observation_type)
+            self._observation_type = observation_type
+        return self._add_done_to_observation(observation, done)
 
     def reset(self, **kwargs):
         observation = self.env.reset()
-        if self.is_vectorized:
-            done = self.done_space.low
-        else:
-            done = False
-        return add_done(observation, done)
+        return self._add_done(observation, self._reset_done)
 
     def step(self, action):
         observation, reward, done, info = self.env.step(action)
-        observation = add_done(observation, done)
+        if self._done_buffer is not None:
+            np.copyto(self._done_buffer, done, casting="unsafe")
+            observation = self._add_done(observation, self._done_buffer)
+        else:
+            observation = self._add_done(observation, done)
         return observation, reward, done, info
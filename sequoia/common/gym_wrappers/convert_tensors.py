@@ -1,5 +1,16 @@
-from functools import singledispatch, wraps
-from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+from functools import partial, singledispatch, wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import gym
 import numpy as np
@@ -24,6 +35,82 @@ S = TypeVar("S", bound=Space)
 # as in Sparse.
 
 
+def _can_pin(value: Any) -> bool:
+    """ Returns wether `value` is an ndarray that can be copied into a pinned Tensor.
+    """
+    return isinstance(value, np.ndarray) and (
+        value.dtype.kind in "bif" or value.dtype == np.uint8
+    )
+
+
+def _make_to_tensor(
+    space: Space, device: Optional[torch.device] = None
+) -> Callable[[Any], Any]:
+    """ Returns a function that converts samples from `space` into Tensors on `device`.
+
+    Equivalent to `partial(to_tensor, space, device=device)`, but the implementation
+    of `to_tensor` for `space` (and for its subspaces, in the case of Dict/Tuple
+    spaces) is resolved once, here. Arrays are converted with `torch.as_tensor`, which
+    shares their memory, and are only copied when moved to a different device.
+    """
+    space_to_tensor = to_tensor.dispatch(type(space))
+    if space_to_tensor is to_tensor.dispatch(Space):
+        to_other_device = device is not None and device.type != "cpu"
+
+        def _array_to_tensor(sample: Any) -> Any:
+            if sample is None:
+                return sample
+            tensor = torch.as_tensor(sample)
+            if to_other_device:
+                return tensor.to(device, non_blocking=True)
+            return tensor
+
+        return _array_to_tensor
+
+    if space_to_tensor is to_tensor.dispatch(TypedDictSpace):
+        item_converters = [
+            (key, _make_to_tensor(subspace, device)) for key, subspace in space.items()
+        ]
+        dtype = space.dtype
+
+        def _typed_dict_to_tensor(sample: Any) -> Any:
+            return dtype(
+                **{key: convert(sample[key]) for key, convert in item_converters}
+            )
+
+        return _typed_dict_to_tensor
+
+    if space_to_tensor is to_tensor.dispatch(NamedTupleSpace):
+        item_converters = [
+            (key, _make_to_tensor(space[i], device))
+            for i, key in enumerate(space._spaces.keys())
+        ]
+        dtype = space.dtype
+
+        def _named_tuple_to_tensor(sample: Any) -> Any:
+            return dtype(
+                **{
+                    key: convert(sample[i])
+                    for i, (key, convert) in enumerate(item_converters)
+                }
+            )
+
+        return _named_tuple_to_tensor
+
+    if space_to_tensor is to_tensor.dispatch(spaces.Tuple):
+        converters = [_make_to_tensor(subspace, device) for subspace in space.spaces]
+
+        def _tuple_to_tensor(sample: Any) -> Any:
+            if sample is None or any(v is None for v in sample):
+                # Let `to_tensor` deal with the edge cases (e.g. sparse spaces).
+                return space_to_tensor(space, sample, device)
+            return tuple(convert(value) for convert, value in zip(converters, sample))
+
+        return _tuple_to_tensor
+
+    return partial(space_to_tensor, space, device=device)
+
+
 class ConvertToFromTensors(IterableWrapper):
     """ Wrapper that converts Tensors into samples/ndarrays and vice versa.
 
@@ -38,11 +125,22 @@ class ConvertToFromTensors(IterableWrapper):
     Tensors as an input.
 
     If `device` is given, created Tensors are moved to the provided device.
+
+    Rewards are converted to `reward_dtype` (float32 by default), so they don't need to
+    be cast again later (e.g. from float64, in the case of vectorized envs). Pass
+    `reward_dtype=None` to keep the dtype of the rewards from the env.
     """
 
-    def __init__(self, env: gym.Env, device: Union[torch.device, str] = None):
+    def __init__(
+        self,
+        env: gym.Env,
+        device: Union[torch.device, str] = None,
+        reward_dtype: Optional[torch.dtype] = torch.float32,
+    ):
         super().__init__(env=env)
-        self.device = device
+        # NOTE: Creating the `torch.device` once, rather than passing a string around.
+        self.device = torch.device(device) if isinstance(device, str) else device
+        self.reward_dtype = reward_dtype
         self.observation_space: Space = add_tensor_support(
             self.env.observation_space, device=device
         )
@@ -62,12 +160,48 @@ class ConvertToFromTensors(IterableWrapper):
             )
         self.reward_space = add_tensor_support(self.reward_space, device=device)
 
+        # The implementations of `to_tensor` / `from_tensor` for each space, resolved
+        # once here rather than dispatched on the type of the space at every step.
+        self._observation_to_tensor = to_tensor.dispatch(type(self.observation_space))
+        self._action_from_tensor = from_tensor.dispatch(type(self.action_space))
+        self._reward_to_tensor = to_tensor.dispatch(type(self.reward_space))
+        # Function used to convert the observations, which doesn't need to dispatch on
+        # the type of the (sub)spaces at each step.
+        self._convert_observation = _make_to_tensor(self.observation_space, self.device)
+
+        # When the observations / rewards are arrays that would just be converted with
+        # `torch.as_tensor`, they are copied to the GPU asynchronously, through pinned
+        # (page-locked) buffers which are re-used at each step.
+        default_to_tensor = to_tensor.dispatch(Space)
+        # Wether the rewards would just be converted with `torch.as_tensor`.
+        self._rewards_are_arrays = self._reward_to_tensor is default_to_tensor
+        self._pin_observations = self._observation_to_tensor is default_to_tensor
+        self._pin_rewards = self._rewards_are_arrays
+        if not (
+            isinstance(self.device, torch.device)
+            and self.device.type == "cuda"
+            and torch.cuda.is_available()
+        ):
+            self._pin_observations = self._pin_rewards = False
+        self._pinned_buffers: Dict[str, Tensor] = {}
+        # Numpy dtypes of the pinned buffers, when different from that of the arrays.
+        self._pinned_dtypes: Dict[str, np.dtype] = {}
+        if self._pin_rewards and self.reward_dtype is not None:
+            try:
+                self._pinned_dtypes["reward"] = (
+                    torch.empty(0, dtype=self.reward_dtype).numpy().dtype
+                )
+            except TypeError:
+                # No numpy equivalent for this dtype (e.g. bfloat16).
+                self._pin_rewards = False
+        self._copy_done: Optional[torch.cuda.Event] = None
+
     def reset(self, *args, **kwargs):
         obs = self.env.reset(*args, **kwargs)
         return self.observation(obs)
 
     def observation(self, observation):
-        return to_tensor(self.observation_space, observation, device=self.device)
+        return self._convert_observation(observation)
 
     def action(self, action):
         if isinstance(self.action_space, spaces.MultiDiscrete) and is_dataclass(action):
@@ -76,7 +210,7 @@ class ConvertToFromTensors(IterableWrapper):
             # FIXME: for now, unwrapping the actions
             action = action_np["y_pred"]
             return action
-        return from_tensor(self.action_space, action)
+        return self._action_from_tensor(self.action_space, action)
 
     def reward(self, reward):
         # FIXME: This doesn't exactly work when our 'reward space' isn't a dict and
@@ -85,7 +219,11 @@ class ConvertToFromTensors(IterableWrapper):
             return replace(
                 reward, y=to_tensor(self.reward_space, reward.y, device=self.device)
             )
-        return to_tensor(self.reward_space, reward, device=self.device)
+        if self._rewards_are_arrays and self.reward_dtype is not None:
+            if reward is None:
+                return reward
+            return torch.as_tensor(reward, dtype=self.reward_dtype, device=self.device)
+        return self._reward_to_tensor(self.reward_space, reward, device=self.device)
 
     def step(self, action: Tensor) -> StepResult:
         action = self.action(action)
@@ -93,8 +231,20 @@ class ConvertToFromTensors(IterableWrapper):
 
         result = self.env.step(action)
         observation, reward, done, info = result
-        observation = self.observation(observation)
-        reward = self.reward(reward)
+        to_copy: Dict[str, np.ndarray] = {}
+        if self._pin_observations and _can_pin(observation):
+            to_copy["observation"] = observation
+        if self._pin_rewards and _can_pin(reward):
+            to_copy["reward"] = reward
+        copied = self._to_device_async(to_copy) if to_copy else {}
+        if "observation" in copied:
+            observation = copied["observation"]
+        else:
+            observation = self.observation(observation)
+        if "reward" in copied:
+            reward = copied["reward"]
+        else:
+            reward = self.reward(reward)
         # NOTE: Not sure this is useful, actually!
         # done = torch.as_tensor(done, device=self.device)
         
@@ -107,6 +257,32 @@ class ConvertToFromTensors(IterableWrapper):
         else:
             return StepResult(observation, reward, done, info)
 
+    def _to_device_async(self, arrays: Dict[str, np.ndarray]) -> Dict[str, Tensor]:
+        """ Copies the arrays into pinned buffers, and then moves these buffers to the
+        device, all with non-blocking copies.
+        """
+        if self._copy_done is not None:
+            # Wait for the copies from the previous step to be done before overwriting
+            # the buffers.
+            self._copy_done.synchronize()
+        tensors: Dict[str, Tensor] = {}
+        for name, array in arrays.items():
+            buffer = self._pinned_buffers.get(name)
+            dtype = self._pinned_dtypes.get(name, array.dtype)
+            if (
+                buffer is None
+                or buffer.shape != array.shape
+                or buffer.numpy().dtype != dtype
+            ):
+                buffer = torch.from_numpy(np.array(array, dtype=dtype)).pin_memory()
+                self._pinned_buffers[name] = buffer
+            else:
+                np.copyto(buffer.numpy(), array, casting="unsafe")
+            tensors[name] = buffer.to(self.device, non_blocking=True)
+        self._copy_done = torch.cuda.Event()
+        self._copy_done.record()
+        return tensors
+
 
 def supports_tensors(space: S) -> bool:
     # TODO: Remove this, instead use a generic function
@@ -117,9 +293,33 @@ def has_tensor_support(space: S) -> bool:
     return supports_tensors(space)
 
 
-def _mark_supports_tensors(space: S) -> None:
+def _mark_supports_tensors(space: S, device: torch.device = None) -> None:
     # TODO: Remove this!
     setattr(space, "_supports_tensors", True)
+    space._tensor_device = torch.device(device) if device else None
+
+
+def _tensor_device(space: S) -> Optional[torch.device]:
+    """ Returns the device on which a space that supports tensors puts its samples. """
+    if isinstance(space, TensorSpace):
+        return space.device
+    return getattr(space, "_tensor_device", None)
+
+
+def _unless_supports_tensors(handler: Callable[..., S]) -> Callable[..., S]:
+    """ Makes a handler of `add_tensor_support` return the space as-is when it already
+    supports tensors on the given device, rather than creating a new space.
+    """
+
+    @wraps(handler)
+    def _wrapper(space: S, device: torch.device = None) -> S:
+        if supports_tensors(space) and _tensor_device(space) == (
+            torch.device(device) if device else None
+        ):
+            return space
+        return handler(space, device=device)
+
+    return _wrapper
 
 
 @singledispatch
@@ -131,34 +331,61 @@ def add_tensor_support(space: S, device: torch.device = None) -> S:
 
     Returns the modified Space.
     """
-    # Save the original methods so we can use them.
-    sample = space.sample
-    contains = space.contains
     if supports_tensors(space):
         # logger.debug(f"Space {space} already supports Tensors.")
         return space
+    # NOTE: Changing the class of `space` to a subclass which overrides `sample` and
+    # `contains`, rather than replacing these methods on the instance with closures.
+    space.__class__ = _tensor_space_class(type(space))
+    space._tensor_device = torch.device(device) if device else None
+    assert has_tensor_support(space)
+    return space
+
+
+# Subclasses of space types created by `_tensor_space_class`.
+_tensor_space_classes: Dict[Type[Space], Type[Space]] = {}
 
-    @wraps(space.sample)
-    def _sample(*args, **kwargs):
-        samples = sample(*args, **kwargs)
-        samples = to_tensor(space, samples)
+
+def _tensor_space_class(space_type: Type[S]) -> Type[S]:
+    """ Returns a subclass of `space_type` whose `sample` method produces Tensors,
+    and whose `contains` method also accepts Tensors.
+
+    The implementations of `to_tensor` and `from_tensor` for `space_type` are
+    resolved once, when the subclass is created.
+    """
+    if space_type in _tensor_space_classes:
+        return _tensor_space_classes[space_type]
+    space_to_tensor = to_tensor.dispatch(space_type)
+    space_from_tensor = from_tensor.dispatch(space_type)
+
+    def sample(self, *args, **kwargs):
+        samples = space_to_tensor(self, space_type.sample(self, *args, **kwargs))
+        device = getattr(self, "_tensor_device", None)
         if device:
             samples = move(samples, device)
         return samples
 
-    @wraps(space.contains)
-    def _contains(x: Union[Tensor, Any]) -> bool:
-        x = from_tensor(space, x)
-        return contains(x)
+    def contains(self, x: Union[Tensor, Any]) -> bool:
+        return space_type.contains(self, space_from_tensor(self, x))
 
-    space.sample = _sample
-    space.contains = _contains
-    _mark_supports_tensors(space)
-    assert has_tensor_support(space)
-    return space
+    sample.__doc__ = space_type.sample.__doc__
+    contains.__doc__ = space_type.contains.__doc__
+    tensor_space_type = type(
+        space_type.__name__,
+        (space_type,),
+        {
+            "sample": sample,
+            "contains": contains,
+            "_supports_tensors": True,
+            "__module__": space_type.__module__,
+        },
+    )
+    _tensor_space_classes[space_type] = tensor_space_type
+    return tensor_space_type
 
 
 @add_tensor_support.register
+@_unless_supports_tensors
 def _(space: Image, device: torch.device = None) -> Image:
     tensor_box = TensorBox(
         space.low, space.high, shape=space.shape, dtype=space.dtype, device=device
@@ -167,6 +394,7 @@ def _(space: Image, device: torch.device = None) -> Image:
 
 
 @add_tensor_support.register
+@_unless_supports_tensors
 def _(space: spaces.Dict, device: torch.device = None) -> spaces.Dict:
     space = type(space)(
         **{
@@ -175,11 +403,12 @@ def _(space: spaces.Dict, device: torch.device = None) -> spaces.Dict:
         }
     )
     # TODO: Remove this '_mark_supports_tensors' and instead use a generic function.
-    _mark_supports_tensors(space)
+    _mark_supports_tensors(space, device=device)
     return space
 
 
 @add_tensor_support.register
+@_unless_supports_tensors
 def _(space: TypedDictSpace, device: torch.device = None) -> TypedDictSpace:
     space = type(space)(
         {
@@ -188,11 +417,12 @@ def _(space: TypedDictSpace, device: torch.device = None) -> TypedDictSpace:
         },
         dtype=space.dtype,
     )
-    _mark_supports_tensors(space)
+    _mark_supports_tensors(space, device=device)
     return space
 
 
 @add_tensor_support.register(NamedTupleSpace)
+@_unless_supports_tensors
 def _(space: Dict, device: torch.device = None) -> Dict:
     space = type(space)(
         **{
@@ -201,16 +431,17 @@ def _(space: Dict, device: torch.device = None) -> Dict:
         },
         dtype=space.dtype,
     )
-    _mark_supports_tensors(space)
+    _mark_supports_tensors(space, device=device)
     return space
 
 
 @add_tensor_support.register(spaces.Tuple)
+@_unless_supports_tensors
 def _(space: Dict, device: torch.device = None) -> Dict:
     space = type(space)(
         [add_tensor_support(value, device=device) for value in space.spaces]
     )
-    _mark_supports_tensors(space)
+    _mark_supports_tensors(space, device=device)
     return space
 
 # TODO: Should this be moved to the place where these are defined instead?
@@ -218,27 +449,25 @@ from sequoia.common.spaces.tensor_spaces import (
     TensorBox,
     TensorDiscrete,
     TensorMultiDiscrete,
+    TensorSpace,
 )
 
 
 @add_tensor_support.register
+@_unless_supports_tensors
 def _(space: spaces.Box, device: torch.device = None) -> spaces.Box:
-    space = TensorBox(
+    return TensorBox(
         space.low, space.high, shape=space.shape, dtype=space.dtype, device=device
     )
-    _mark_supports_tensors(space)
-    return space
 
 
 @add_tensor_support.register
+@_unless_supports_tensors
 def _(space: spaces.Discrete, device: torch.device = None) -> spaces.Box:
-    space = TensorDiscrete(n=space.n, device=device)
-    _mark_supports_tensors(space)
-    return space
+    return TensorDiscrete(n=space.n, device=device)
 
 
 @add_tensor_support.register
+@_unless_supports_tensors
 def _(space: spaces.MultiDiscrete, device: torch.device = None) -> spaces.Box:
-    space = TensorMultiDiscrete(nvec=space.nvec, device=device)
-    _mark_supports_tensors(space)
-    return space
+    return TensorMultiDiscrete(nvec=space.nvec, device=device)
@@ -81,4 +81,50 @@ def test_preserves_dtype_of_typeddict_space():
         dtype=Foo,
     )
     output_space = add_tensor_support(input_space)
-    assert output_space.dtype is input_space.dtype
\ No newline at end of file
+    assert output_space.dtype is input_space.dtype
+
+def test_add_tensor_support_to_other_spaces():
+    """ Spaces without a dedicated 'Tensor' version (e.g. MultiBinary) get their class
+    changed to a subclass that produces and accepts tensors.
+    """
+    space = add_tensor_support(spaces.MultiBinary(4))
+    assert isinstance(space, spaces.MultiBinary)
+    assert type(space) is not spaces.MultiBinary
+    assert "sample" not in vars(space)
+    sample = space.sample()
+    assert isinstance(sample, Tensor)
+    assert sample.dtype == torch.bool
+    assert sample in space
+    assert sample.numpy() in space
+    # The subclass is only created once per space type.
+    assert type(add_tensor_support(spaces.MultiBinary(2))) is type(space)
+
+
+def test_add_tensor_support_is_a_no_op_on_tensor_spaces():
+    """ Spaces that already support tensors on the given device are returned as-is. """
+    space = add_tensor_support(
+        spaces.Dict(x=spaces.Box(0, 1, shape=[2]), t=spaces.Discrete(3))
+    )
+    assert add_tensor_support(space) is space
+    assert add_tensor_support(space["x"]) is space["x"]
+    assert add_tensor_support(space["t"]) is space["t"]
+    # Asking for a different device still creates a new space.
+    assert add_tensor_support(space["x"], device="cpu") is not space["x"]
+
+
+def test_observations_share_memory_with_arrays():
+    """ On the CPU, the observations are converted without copying the arrays. """
+    from .convert_tensors import _make_to_tensor
+
+    space = add_tensor_support(spaces.Box(0, 1, shape=[3, 4], dtype=np.float32))
+    obs = space.low.copy()
+    convert = _make_to_tensor(space, device=None)
+    tensor = convert(obs)
+    assert isinstance(tensor, Tensor)
+    obs[0, 0] = 0.5
+    assert tensor[0, 0] == 0.5
+
+    tuple_space = spaces.Tuple([space, spaces.Discrete(2)])
+    values = _make_to_tensor(tuple_space, device=torch.device("cpu"))((obs, 1))
+    assert values[0].data_ptr() == tensor.data_ptr()
+    assert values[1] == 1
@@ -119,7 +119,9 @@ class EpisodeLimit(EpisodeCounter):
                 )
                 warnings.warn(colorize(f"WARN: {w}", "yellow"))
 
-        logger.debug(f"Starting episode  {self._episode_counter}/{self._max_episodes})")
+        logger.debug(
+            "Starting episode  %s/%s)", self._episode_counter, self._max_episodes
+        )
         if self._episode_counter == self._max_episodes:
             logger.warning("Beware, entering last episode")
         return obs
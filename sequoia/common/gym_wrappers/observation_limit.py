@@ -26,6 +26,8 @@ class ObservationLimit(IterableWrapper):
         super().__init__(env=env)
         self._max_obs = max_steps
         self._obs_counter: int = 0
+        # Number of observations received at each step / reset.
+        self._increment: int = self.env.num_envs if self.is_vectorized else 1
         self._initial_reset = False
         self._is_closed: bool = False
 
@@ -36,8 +38,9 @@ class ObservationLimit(IterableWrapper):
             raise ClosedEnvironmentError("Can't step through closed env.")
 
         # Resetting actually gives you an observation, so we count it here.
-        self._obs_counter += self.env.num_envs if self.is_vectorized else 1
-        logger.debug(f"(observation {self._obs_counter}/{self._max_obs})")
+        self._obs_counter += self._increment
+        # NOTE: Not using an f-string, so the message is only formatted if needed.
+        logger.debug("(observation %s/%s)", self._obs_counter, self._max_obs)
         
         obs = self.env.reset()
 
@@ -58,11 +61,13 @@ class ObservationLimit(IterableWrapper):
 
         obs, reward, done, info = self.env.step(action)
 
-        self._obs_counter += self.env.num_envs if self.is_vectorized else 1
-        logger.debug(f"(observation {self._obs_counter}/{self._max_obs})")
+        obs_counter = self._obs_counter + self._increment
+        self._obs_counter = obs_counter
+        max_obs = self._max_obs
+        logger.debug("(observation %s/%s)", obs_counter, max_obs)
 
         # BUG: If we dont use >=, then iteration with EnvDataset doesn't work.
-        if self._obs_counter >= self._max_obs:
+        if obs_counter >= max_obs:
             self.close()
 
         return obs, reward, done, info
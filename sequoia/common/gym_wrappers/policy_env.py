@@ -216,11 +216,13 @@ class PolicyEnv(gym.Wrapper, IterableDataset, Iterable[DatasetItem]):
             assert self._observation is not None
             previous_observations = self._observation
 
-        logger.debug(f"Start of episode {self._n_episodes}")
+        logger.debug("Start of episode %s", self._n_episodes)
 
         done = False
         while not done:
-            logger.debug(f"steps (episode): {self._n_steps_in_episode}, total: {self._n_steps}")
+            logger.debug(
+                "steps (episode): %s, total: %s", self._n_steps_in_episode, self._n_steps
+            )
             # Get the batch of actions using the policy.
             actions = self.policy(previous_observations, self.action_space)
 
@@ -248,7 +250,7 @@ class PolicyEnv(gym.Wrapper, IterableDataset, Iterable[DatasetItem]):
 
             self._n_episodes += 1
 
-        logger.debug(f"Episode has ended.")
+        logger.debug("Episode has ended.")
         self._reset = False
         
     
\ No newline at end of file
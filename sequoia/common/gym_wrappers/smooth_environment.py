@@ -5,8 +5,8 @@ the task, rather than setting a brand new random task.
 There could also be some kind of 'task_duration' parameter, and the model does
 linear or smoothed-out transitions between them depending on the step number?
 """
-from functools import singledispatch
-from typing import Dict, List, Optional, TypeVar
+from functools import singledispatch, wraps
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
 import gym
 import numpy as np
@@ -20,6 +20,68 @@ from .multi_task_environment import MultiTaskEnvironment, add_task_labels
 
 logger = get_logger(__file__)
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _counts_modifications(method: Callable) -> Callable:
+    @wraps(method)
+    def _method(self: "_TaskSchedule", *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    return _method
+
+
+class _TaskSchedule(dict):
+    """ Dict used for the task schedule of `SmoothTransitions`, which counts the number
+    of times it was modified, so that the interpolation arrays are only re-computed
+    when needed.
+
+    NOTE: Changes to the task dicts themselves aren't counted.
+    """
+    # NOTE: Also set on the class, since items are set before `__dict__` is restored
+    # when unpickling.
+    version: int = 0
+
+    __setitem__ = _counts_modifications(dict.__setitem__)
+    __delitem__ = _counts_modifications(dict.__delitem__)
+    clear = _counts_modifications(dict.clear)
+    pop = _counts_modifications(dict.pop)
+    popitem = _counts_modifications(dict.popitem)
+    setdefault = _counts_modifications(dict.setdefault)
+    update = _counts_modifications(dict.update)
+
+
+def _interpolate(
+    steps: np.ndarray, fixed_points: np.ndarray, x: float, out: np.ndarray
+) -> None:
+    """ Writes in `out` the values of the task params at step `x`, linearly
+    interpolated from their values `fixed_points` (shape [n_params, n_steps]) at the
+    (sorted) `steps`.
+
+    Same as calling `np.interp(x, steps, fixed_points[i])` for each task param, but
+    with a single search and blend for all of them.
+    """
+    n_steps = len(steps)
+    if n_steps == 1:
+        out[:] = fixed_points[:, 0]
+        return
+    index = np.searchsorted(steps, x, side="right") - 1
+    index = min(max(index, 0), n_steps - 2)
+    start = steps[index]
+    end = steps[index + 1]
+    t = min(max((x - start) / (end - start), 0.0), 1.0)
+    out[:] = fixed_points[:, index] * (1 - t) + fixed_points[:, index + 1] * t
+
+
+if njit is not None:
+    # Compile the interpolation when numba is installed, since it is called at every
+    # step.
+    _interpolate = njit(cache=True)(_interpolate)
+
 
 ## TODO (@lebrice): Really cool idea!: Create a TaskSchedule class that inherits
 # from Dict and when you __getitem__ a missing key, returns an interpolation!
@@ -91,6 +153,13 @@ class SmoothTransitions(MultiTaskEnvironment):
             **kwargs
         )
         self.only_update_on_episode_end: bool = only_update_on_episode_end
+        # Arrays used in `smooth_update`, created from the task schedule (in the
+        # `task_schedule` setter, which is called in `super().__init__`), along with
+        # the version of the task schedule they were created from.
+        self._interpolation_version: int
+        self._interpolation_steps: np.ndarray
+        self._interpolation_values: np.ndarray
+        self._task_values: np.ndarray
         if self._max_steps is None and len(self.task_schedule) > 1:
             # TODO: DO we want to prevent going past the 'task step' in the task schedule?
             pass
@@ -139,20 +208,52 @@ class SmoothTransitions(MultiTaskEnvironment):
         attributes.
         """
 
-        current_task: Dict[str, float] = {}
-        for attr in self.task_params:
-            steps: List[int] = []
-            # list of the
-            fixed_points: List[float] = []
-            for step, task in sorted(self.task_schedule.items()):
-                steps.append(step)
-                fixed_points.append(task.get(attr, self.default_task[attr]))
-            # logger.debug(f"{attr}: steps={steps}, fp={fixed_points}")
-            interpolated_value: float = np.interp(
-                x=self.steps, xp=steps, fp=fixed_points,
-            )
-            current_task[attr] = interpolated_value
-            # logger.debug(f"interpolated value of {attr} at step {self.step}: {interpolated_value}")
-        # logger.debug(f"Updating task at step {self.step}: {current_task}")
-        self.current_task = current_task
+        steps, fixed_points = self._interpolation_arrays()
+        _interpolate(steps, fixed_points, self.steps, self._task_values)
+        # NOTE: Updating the values in the current task dict and on the env directly,
+        # rather than creating a new dict and going through the `current_task` setter,
+        # which would also compare it with all the tasks in the task schedule.
+        current_task = self._current_task
+        unwrapped = self.env.unwrapped
+        for name, value in zip(self.task_params, self._task_values.tolist()):
+            current_task[name] = value
+            setattr(unwrapped, name, value)
+
+    @property
+    def task_schedule(self) -> Dict[int, Dict[str, float]]:
+        return self._task_schedule
 
+    @task_schedule.setter
+    def task_schedule(self, value: Dict[int, Dict[str, float]]) -> None:
+        """ Sets the task schedule, and re-computes the interpolation arrays.
+
+        NOTE: Adding, removing or replacing steps of the task schedule in-place (e.g.
+        `env.task_schedule[10] = {...}`) also updates the interpolation. However, when
+        modifying the task dicts in-place, the task schedule needs to be set again.
+        """
+        MultiTaskEnvironment.task_schedule.fset(self, value)
+        self._task_schedule = _TaskSchedule(self._task_schedule)
+        self._update_interpolation_arrays()
+
+    def _interpolation_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the (sorted) steps of the task schedule, as well as the values of
+        the task params at these steps, as an array of shape [n_params, n_steps].
+        """
+        if self._task_schedule.version != self._interpolation_version:
+            self._update_interpolation_arrays()
+        return self._interpolation_steps, self._interpolation_values
+
+    def _update_interpolation_arrays(self) -> None:
+        self._interpolation_version = self._task_schedule.version
+        schedule = sorted(self._task_schedule.items())
+        self._interpolation_steps = np.array(
+            [step for step, _ in schedule], dtype=float
+        )
+        self._interpolation_values = np.array(
+            [
+                [task.get(attr, self.default_task[attr]) for _, task in schedule]
+                for attr in self.task_params
+            ],
+            dtype=float,
+        ).reshape([len(self.task_params), len(schedule)])
+        self._task_values = np.empty(len(self.task_params))
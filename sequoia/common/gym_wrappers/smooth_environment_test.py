@@ -128,3 +128,32 @@ def test_task_id_is_always_None():
             
             expected_length = start_length + ((i+1) / total_steps) * (end_length - start_length)
         assert np.isclose(env.length, expected_length)
+
+
+def test_changing_the_task_schedule():
+    """ The values used for the interpolation are updated when the task schedule
+    is changed.
+    """
+    original = gym.make("CartPole-v0")
+    start_length = original.length
+    env = SmoothTransitions(original, task_schedule={10: dict(length=2.0)})
+    env.seed(123)
+    env.reset()
+    env.step(env.action_space.sample())
+    assert np.isclose(env.length, start_length)
+
+    env.task_schedule = {10: dict(length=5.0)}
+    env.step(env.action_space.sample())
+    assert np.isclose(env.length, start_length + (1 / 10) * (5.0 - start_length))
+
+    # Changing the task schedule in-place also updates the interpolation.
+    env.task_schedule[10] = dict(length=3.0)
+    env.step(env.action_space.sample())
+    assert np.isclose(env.length, start_length + (2 / 10) * (3.0 - start_length))
+
+    # When changing a task dict in-place, the task schedule needs to be set again.
+    env.task_schedule[10]["length"] = 4.0
+    env.task_schedule = env.task_schedule
+    env.step(env.action_space.sample())
+    assert np.isclose(env.length, start_length + (3 / 10) * (4.0 - start_length))
+    env.close()
@@ -46,4 +46,146 @@ def test_to_log_dict_order():
         'total/task_a/accuracy': 0.95,
         'total/task_b/loss': 2.1,
         'total/task_c/loss': 3.0
-    }
\ No newline at end of file
+    }
+
+
+def test_iadd_is_in_place():
+    """ `+=` updates the dicts of the Loss in-place, without affecting other Losses
+    that were created from it.
+    """
+    loss = Loss("total")
+    losses = loss.losses
+    loss += Loss("task_a", loss=1.23, metrics={"accuracy": 0.95})
+    assert loss.losses is losses
+    assert set(loss.losses) == {"task_a"}
+
+    scaled_loss = loss * 2
+    scaled_loss += Loss("total", metrics={"task_b": 0.5})
+    assert "task_b" in scaled_loss.metrics
+    assert "task_b" not in loss.metrics
+
+
+def test_detach_on_add():
+    """ When `_detach_on_add` is set, the accumulated losses don't require grad. """
+    import torch
+
+    weight = torch.ones(1, requires_grad=True)
+    total = Loss("total", _detach_on_add=True)
+    for i in range(3):
+        total += Loss("total", loss=(weight * i).sum())
+        total += Loss("task_a", loss=(weight * i).sum())
+    assert not total.requires_grad
+    assert total.loss == 6
+    assert not total.losses["task_a"].requires_grad
+    # By default, the graph is kept, so the accumulated loss can be backpropagated.
+    total = Loss("total")
+    total += Loss("total", loss=(weight * 2).sum())
+    assert total.requires_grad
+
+
+def test_nested_losses_log_dict_and_pbar_message():
+    """ The keys of nested losses are prefixed with the names of their parents. """
+    task_a_loss = Loss("task_a", loss=1.0, metrics={"accuracy": 0.5})
+    task_a_loss += Loss("rotate", loss=2.0)
+    loss = Loss("total")
+    loss += task_a_loss
+    assert loss.to_log_dict() == {
+        "total/loss": 3.0,
+        "total/task_a/loss": 3.0,
+        "total/task_a/accuracy": 0.5,
+        "total/task_a/rotate/loss": 2.0,
+    }
+    assert loss.to_pbar_message() == {
+        "total Loss": 3.0,
+        "total task_a Loss": 3.0,
+        "total task_a accuracy": 0.5,
+        "total task_a rotate Loss": 2.0,
+    }
+
+
+def test_metrics_are_reused_for_the_same_tensors():
+    """ Losses created from the same tensors share the same Metrics, unless the
+    tensors are modified in-place.
+    """
+    import torch
+
+    y_pred = torch.Tensor([[0.8, 0.2], [0.1, 0.9], [0.3, 0.7]])
+    y = torch.as_tensor([0, 1, 0])
+    loss_a = Loss("head_a", y_pred=y_pred, y=y)
+    loss_b = Loss("head_b", y_pred=y_pred, y=y)
+    assert loss_b.metric is loss_a.metric
+    assert loss_a.metric.accuracy == round(2 / 3, 6)
+
+    y[2] = 1
+    loss_c = Loss("head_c", y_pred=y_pred, y=y)
+    assert loss_c.metric is not loss_a.metric
+    assert loss_c.metric.accuracy == 1.0
+
+
+def test_adding_empty_loss_returns_a_copy_of_the_other_loss():
+    """ Adding an empty Loss with the same name gives a copy of the other Loss, which
+    isn't modified when the result is changed in-place.
+    """
+    loss = Loss("total", loss=1.0, metrics={"accuracy": 0.95})
+    for result in [loss + Loss("total"), Loss("total") + loss]:
+        assert result is not loss
+        assert result.loss == loss.loss
+        assert result.metrics == loss.metrics
+        result += Loss("total", loss=2.0)
+        assert result.loss == 3.0
+        assert loss.loss == 1.0
+    # An empty loss with a different name still gets added as a sub-loss.
+    assert "task_a" in (loss + Loss("task_a")).losses
+
+
+def test_adding_empty_loss_keeps_the_graph():
+    """ The copy made when adding an empty Loss keeps the loss tensor as-is. """
+    import torch
+
+    x = torch.ones(2, requires_grad=True)
+    loss = Loss("total", loss=(x * 2).sum())
+    result = Loss("total") + loss
+    assert result.loss is loss.loss
+    result.loss.backward()
+    assert (x.grad == 2).all()
+
+
+def test_tensors_are_converted_when_set():
+    """ Values in `tensors` are converted to tensors, also when added later. """
+    import torch
+
+    loss = Loss("total", tensors={"x": [1, 2, 3], "h_x": torch.ones(2)})
+    assert isinstance(loss.tensors["x"], torch.Tensor)
+    assert loss._device == torch.device("cpu")
+    loss.tensors["y"] = [0, 1]
+    assert isinstance(loss.tensors["y"], torch.Tensor)
+
+
+def test_loss_with_tensors_can_be_pickled():
+    """ A Loss with tensors can be pickled (e.g. to be sent to another process). """
+    import pickle
+
+    import torch
+
+    loss = Loss("total", loss=1.23, tensors={"x": torch.ones(2)})
+    new_loss = pickle.loads(pickle.dumps(loss))
+    assert new_loss.tensors.device == torch.device("cpu")
+    assert (new_loss.tensors["x"] == loss.tensors["x"]).all()
+
+
+def test_keys_of_loss_subclass():
+    """ The keys of a Loss (as a Mapping) are the fields of its own class, without the
+    private `_detach_on_add` flag.
+    """
+    from dataclasses import dataclass
+
+    @dataclass
+    class LossWithExtraField(Loss):
+        extra: int = 0
+
+    loss = LossWithExtraField("total", extra=1)
+    assert "extra" in loss
+    assert dict(loss)["extra"] == 1
+    assert len(loss) == len(Loss("total")) + 1
+    assert "_detach_on_add" not in dict(loss)
+    assert "_detach_on_add" not in Loss("total")
@@ -86,11 +86,13 @@ class ClassificationMetrics(Metrics):
             return NotImplemented
         
         # Create the 'sum' confusion matrix:
+        # NOTE: The confusion matrices are never modified in-place, so when one of them
+        # is None, the other one can be re-used as-is, rather than copied.
         confusion_matrix: Optional[np.ndarray] = None
         if self.confusion_matrix is None and other.confusion_matrix is not None:
-            confusion_matrix = other.confusion_matrix.clone()
+            confusion_matrix = other.confusion_matrix
         elif other.confusion_matrix is None:
-            confusion_matrix = self.confusion_matrix.clone()
+            confusion_matrix = self.confusion_matrix
         else:
             confusion_matrix = self.confusion_matrix + other.confusion_matrix
         
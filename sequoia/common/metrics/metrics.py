@@ -6,7 +6,8 @@ the metrics from PL much yet, to be honest).
 """
 from abc import abstractmethod
 from dataclasses import InitVar, dataclass, field, fields
-from typing import Any, Dict, Optional, TypeVar, Union
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar, Union
 
 import numpy as np
 import torch
@@ -16,6 +17,31 @@ from sequoia.utils.serialization import Serializable
 
 MetricsType = TypeVar("MetricsType", bound="Metrics")
 
+# Wether `Tensor.numpy` accepts `force=True` (torch>=1.13), which detaches the tensor
+# and moves it to the cpu in a single call.
+try:
+    torch.zeros(0).numpy(force=True)
+    _NUMPY_ACCEPTS_FORCE = True
+except TypeError:
+    _NUMPY_ACCEPTS_FORCE = False
+
+
+def _to_numpy(val: Any) -> Any:
+    if isinstance(val, Tensor):
+        if _NUMPY_ACCEPTS_FORCE:
+            return val.numpy(force=True)
+        return val.detach().cpu().numpy()
+    if isinstance(val, (list, tuple)):
+        return np.array(val)
+    return val
+
+
+@lru_cache(maxsize=None)
+def _field_names(metrics_type: Type["Metrics"]) -> Tuple[str, ...]:
+    """ Returns the names of the fields of the given Metrics class. """
+    return tuple(f.name for f in fields(metrics_type))
+
+
 @dataclass
 class Metrics(Serializable):
     # This field isn't used in comparisons between Metrics.
@@ -90,34 +116,20 @@ class Metrics(Serializable):
             if not (field.repr or verbose):
                 continue  # skip field.
             value = getattr(self, field.name)
-            if isinstance(value, Metrics):
-                log_dict[field.name] = value.to_log_dict(verbose=verbose)
+            to_log_dict = getattr(value, "to_log_dict", None)
+            if to_log_dict is not None:
+                log_dict[field.name] = to_log_dict(verbose=verbose)
             else:
                 log_dict[field.name] = value
         return log_dict
 
-        return {
-            f.name: getattr(self, f.name) for f in fields(self)
-            if f.repr or verbose
-        }
-        
-        if verbose:
-            return {"n_samples": self.n_samples}
-        return {}
-
     def to_pbar_message(self) -> Dict[str, Union[str, float]]:
         return {}
 
     def numpy(self):
         """Returns a new object with all the tensor fields converted to numpy arrays."""
-        def to_numpy(val: Any):
-            if isinstance(val, Tensor):
-                return val.detach().cpu().numpy()
-            if isinstance(val, (list, tuple)):
-                return np.array(val)
-            return val
         return type(self)(**{
-            name: to_numpy(val) for name, val in self.items()
+            name: _to_numpy(getattr(self, name)) for name in _field_names(type(self))
         })
 
     @property
@@ -41,18 +41,17 @@ def get_confusion_matrix(y_pred: Union[np.ndarray, Tensor], y: Union[np.ndarray,
     assert y.shape == y_preds.shape, (y.shape, y_preds.shape)
     # assert y.dtype == y_preds.dtype == np.int, (y.dtype, y_preds.dtype)
 
-    confusion_matrix = np.zeros([n_classes, n_classes])
-    
     assert 0 <= y.min() and y.max() < n_classes, (y, n_classes)
     assert 0 <= y_preds.min() and y_preds.max() < n_classes, (y_preds, n_classes)
-    
-    for y_t, y_p in zip(y, y_preds):
-        confusion_matrix[y_t, y_p] += 1
+
+    # NOTE: Counting the (y, y_pred) pairs with a single `bincount`, rather than
+    # incrementing the entries of the matrix in a python loop over the samples.
+    counts = np.bincount(y * n_classes + y_preds, minlength=n_classes * n_classes)
+    confusion_matrix = counts.reshape([n_classes, n_classes]).astype(float)
     return confusion_matrix
 
 @torch.no_grad()
 def accuracy(y_pred: Union[Tensor, np.ndarray], y: Union[Tensor, np.ndarray]) -> float:
-    confusion_mat = get_confusion_matrix(y_pred=y_pred, y=y)
     batch_size = y_pred.shape[0]
     _, predicted = y_pred.max(-1)
     acc = (predicted == y).sum(dtype=float) / batch_size
@@ -68,6 +67,23 @@ def get_accuracy(confusion_matrix: Union[Tensor, np.ndarray]) -> float:
 
 @torch.no_grad()
 def class_accuracy(y_pred: Tensor, y: Tensor) -> Tensor:
+    if (
+        isinstance(y_pred, Tensor)
+        and isinstance(y, Tensor)
+        and y_pred.is_floating_point()
+        and y_pred.shape[-1] > 1
+    ):
+        # NOTE: When given logits, count the samples and the correct predictions for
+        # each class with `scatter_add_`, on the same device as the tensors, rather
+        # than creating the whole confusion matrix on the cpu.
+        n_classes = y_pred.shape[-1]
+        y = y.flatten().long()
+        correct = (y_pred.argmax(-1).flatten() == y).long()
+        totals = torch.zeros(n_classes, dtype=torch.long, device=y.device)
+        totals.scatter_add_(0, y, torch.ones_like(y))
+        hits = torch.zeros(n_classes, dtype=torch.long, device=y.device)
+        hits.scatter_add_(0, y, correct)
+        return hits.double() / totals.clamp(min=1)
     confusion_mat = get_confusion_matrix(y_pred=y_pred, y=y)
     return get_class_accuracy(confusion_mat)
 
@@ -3,7 +3,12 @@ as a bit of a hybrid between `gym.spaces.Dict` and `gym.spaces.Tuple`.
 """
 from collections import namedtuple
 from collections.abc import Mapping as MappingABC
-from typing import Any, Dict, Mapping, Sequence, Tuple, Type, Union, List, Iterable
+from functools import lru_cache
+from itertools import accumulate
+from operator import itemgetter
+from typing import (
+    Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, Union
+)
 
 import gym
 import numpy as np
@@ -11,6 +16,17 @@ from gym import Space, spaces
 from sequoia.utils.generic_functions._namedtuple import NamedTuple
 
 
+@lru_cache(maxsize=128)
+def _make_namedtuple(names: Tuple[str, ...]) -> Type[NamedTuple]:
+    """ Creates the namedtuple class used as the default `dtype` of a NamedTupleSpace.
+
+    The classes are cached, since `namedtuple` generates and `exec`s source code each
+    time it is called, and spaces with the same names are created often (e.g. for
+    each env when batching spaces).
+    """
+    return namedtuple("NamedTuple", names)
+
+
 class NamedTupleSpace(spaces.Tuple):
     """
     A tuple (i.e., product) of simpler (named) spaces. Samples are namedtuples.
@@ -51,9 +67,14 @@ class NamedTupleSpace(spaces.Tuple):
         spaces = tuple(self._spaces.values())
         super().__init__(spaces)
         self.names: Sequence[str] = tuple(self._spaces.keys())
-        self.dtype: Type[Tuple] = dtype or namedtuple("NamedTuple", self.names)
+        self.dtype: Type[Tuple] = dtype or _make_namedtuple(self.names)
         # idea: could use this _name attribute to change the __repr__ first part
         self._name = self.dtype.__name__
+        # Used to get the items of a mapping as a tuple in `contains`. (NOTE: With a
+        # single name, `itemgetter` would return the item rather than a tuple.)
+        self._get_items: Optional[Callable[[Mapping], Tuple]] = (
+            itemgetter(*self.names) if len(self.names) > 1 else None
+        )
         assert all(name == key for name, key in zip(self.names, self._spaces.keys()))
     
     def __getitem__(self, index: Union[int, str]) -> Space:
@@ -97,7 +118,10 @@ class NamedTupleSpace(spaces.Tuple):
             # TODO: If a namedtuple/dataclass has more items than those required
             # by this space, should we consider it valid if all its items are
             # contained in their respective spaces in `self`?
-            x = tuple(x[k] for k in self.names)
+            if self._get_items is not None:
+                x = self._get_items(x)
+            else:
+                x = tuple(x[k] for k in self.names)
             # x = tuple(x.values())
         return super().contains(x)
     
@@ -133,10 +157,48 @@ def batch_namedtuple_space(space: NamedTupleSpace, n: int = 1):
 from sequoia.common.batch import Batch
 
 
+def _flat_layout(
+    space: NamedTupleSpace,
+) -> Optional[Tuple[int, np.dtype, Tuple[int, ...]]]:
+    """ Returns the size, dtype and offsets of the subspaces in the flattened samples
+    of `space`, or None if some of the subspaces can't be flattened.
+
+    This is computed once, and then saved on the space.
+    """
+    layout = space.__dict__.get("_flat_layout")
+    if layout is None:
+        try:
+            flat_spaces = [flatten_space(subspace) for subspace in space.spaces]
+        except NotImplementedError:
+            layout = ()
+        else:
+            sizes = [int(np.prod(flat_space.shape)) for flat_space in flat_spaces]
+            layout = (
+                sum(sizes),
+                np.result_type(*[flat_space.dtype for flat_space in flat_spaces]),
+                tuple(accumulate([0] + sizes)),
+            )
+        space._flat_layout = layout
+    return layout or None
+
+
 @flatten.register
 def flatten_namedtuple_space_sample(space: NamedTupleSpace, x: NamedTuple):
     if isinstance(x, Batch):
         x = x.as_tuple()
-    return np.concatenate([
-                flatten(s, x_part) for x_part, s in zip(x, space.spaces)
-        ])
+    layout = _flat_layout(space)
+    if layout is None:
+        return np.concatenate([
+                    flatten(s, x_part) for x_part, s in zip(x, space.spaces)
+            ])
+    # NOTE: Writing each flattened item into a single pre-allocated array, rather
+    # than concatenating them. Boxes with the same dtype as the result are written
+    # directly, without creating an intermediate flattened copy.
+    size, dtype, offsets = layout
+    result = np.empty(size, dtype=dtype)
+    for x_part, s, start, end in zip(x, space.spaces, offsets, offsets[1:]):
+        if type(s) is spaces.Box and s.dtype == dtype:
+            result[start:end] = np.ravel(x_part)
+        else:
+            result[start:end] = flatten(s, x_part)
+    return result
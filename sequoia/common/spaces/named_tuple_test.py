@@ -7,6 +7,35 @@ from gym.vector.utils import batch_space
 from .named_tuple import NamedTuple, NamedTupleSpace
 
 
+def test_default_dtype_is_reused():
+    """ Spaces with the same names share the same (generated) namedtuple class. """
+    space_a = NamedTupleSpace(x=Box(0, 1, (2,)), t=Discrete(2))
+    space_b = NamedTupleSpace(x=Box(0, 1, (3,)), t=Discrete(4))
+    assert space_a.dtype is space_b.dtype
+    assert NamedTupleSpace(t=Discrete(2), x=Box(0, 1, (2,))).dtype is not space_a.dtype
+    assert space_a.sample() in space_a
+
+
+def test_flatten():
+    """ Flattening a sample gives the same result as concatenating the flattened
+    items.
+    """
+    from gym.spaces.utils import flatten
+
+    space = NamedTupleSpace(
+        x=Box(0, 1, (2, 3), dtype=np.float32),
+        t=Discrete(3),
+        y=Box(0, 1, (4,), dtype=np.float32),
+    )
+    sample = space.sample()
+    expected = np.concatenate(
+        [flatten(subspace, value) for subspace, value in zip(space.spaces, sample)]
+    )
+    flattened = flatten(space, sample)
+    assert flattened.dtype == expected.dtype
+    assert np.array_equal(flattened, expected)
+
+
 def test_basic():
     named_tuple_space = NamedTupleSpace(
         current_state=Box(0, 1, (2,2)),
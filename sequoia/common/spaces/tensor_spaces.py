@@ -1,7 +1,8 @@
 """ TODO: Maybe create a typed version of 'add_tensor_support' of gym_wrappers.convert_tensors
 """
 import gym
-from typing import Union, Optional
+from functools import lru_cache
+from typing import Dict, Tuple, Union, Optional
 from gym import spaces
 from torch import Tensor
 import numpy as np
@@ -25,40 +26,39 @@ numpy_to_torch_dtypes = {
 torch_to_numpy_dtypes = {value: key for (key, value) in numpy_to_torch_dtypes.items()}
 
 
-def get_numpy_dtype_equivalent_to(torch_dtype: torch.dtype) -> np.dtype:
-    """ TODO: Gets the numpy dtype equivalent to the given torch dtype. """
+# Same as the dicts above, but with the canonical `np.dtype` objects rather than the
+# numpy types (e.g. `np.dtype("float32")` rather than `np.float32`).
+_torch_dtypes_from_numpy = {
+    np.dtype(key): value for key, value in numpy_to_torch_dtypes.items()
+}
+_numpy_dtypes_from_torch = {
+    key: np.dtype(value) for key, value in torch_to_numpy_dtypes.items()
+}
 
-    def dtypes_equal(a: torch.dtype, b: torch.dtype) -> bool:
-        return a == b  # simple for now.
 
-    matching_dtypes = [
-        v for k, v in torch_to_numpy_dtypes.items() if dtypes_equal(k, torch_dtype)
-    ]
-    if len(matching_dtypes) == 0:
-        raise RuntimeError(f"Unable to find a numpy dtype equivalent to {torch_dtype}")
-    if len(matching_dtypes) > 1:
+@lru_cache(maxsize=None)
+def get_numpy_dtype_equivalent_to(torch_dtype: torch.dtype) -> np.dtype:
+    """ Gets the numpy dtype equivalent to the given torch dtype. """
+    try:
+        return _numpy_dtypes_from_torch[torch_dtype]
+    except KeyError:
         raise RuntimeError(
-            f"Found more than one match for dtype {torch_dtype}: {matching_dtypes}"
-        )
-    return np.dtype(matching_dtypes[0])
+            f"Unable to find a numpy dtype equivalent to {torch_dtype}"
+        ) from None
 
 
+@lru_cache(maxsize=None)
 def get_torch_dtype_equivalent_to(numpy_dtype: np.dtype) -> torch.dtype:
-    """ TODO: Gets the torch dtype equivalent to the given np dtype. """
-
-    def dtypes_equal(a: torch.dtype, b: torch.dtype) -> bool:
-        return a == b  # simple for now.
-
-    matching_dtypes = [
-        v for k, v in numpy_to_torch_dtypes.items() if dtypes_equal(k, numpy_dtype)
-    ]
-    if len(matching_dtypes) == 0:
-        raise RuntimeError(f"Unable to find a torch dtype equivalent to {numpy_dtype}")
-    if len(matching_dtypes) > 1:
+    """ Gets the torch dtype equivalent to the given np dtype. """
+    try:
+        # NOTE: `np.dtype(None)` would give float64.
+        if numpy_dtype is None:
+            raise TypeError(numpy_dtype)
+        return _torch_dtypes_from_numpy[np.dtype(numpy_dtype)]
+    except (KeyError, TypeError):
         raise RuntimeError(
-            f"Found more than one match for dtype {numpy_dtype}: {matching_dtypes}"
-        )
-    return matching_dtypes[0]
+            f"Unable to find a torch dtype equivalent to {numpy_dtype}"
+        ) from None
 
 
 from inspect import isclass
@@ -75,6 +75,22 @@ def is_torch_dtype(dtype: Any) -> bool:
     return isinstance(dtype, torch.dtype)
 
 
+@lru_cache(maxsize=None)
+def _numpy_and_torch_dtypes(dtype: Any) -> Tuple[np.dtype, torch.dtype]:
+    """ Returns the numpy and torch dtypes to use for the `dtype` given to a
+    TensorSpace.
+    """
+    if is_numpy_dtype(dtype):
+        return np.dtype(dtype), get_torch_dtype_equivalent_to(dtype)
+    if is_torch_dtype(dtype):
+        return get_numpy_dtype_equivalent_to(dtype), dtype
+    if str(dtype) == "float32":
+        return np.dtype(np.float32), torch.float32
+    assert not any(dtype == k for k in numpy_to_torch_dtypes)
+    assert not any(dtype == k for k in torch_to_numpy_dtypes)
+    raise NotImplementedError(f"Unsupported dtype {dtype} (of type {type(dtype)})")
+
+
 from abc import ABC
 
 
@@ -89,6 +105,9 @@ class TensorSpace(gym.Space, ABC):
     produce tensors, respectively.
     """
 
+    # Class-level flag checked by `supports_tensors` in `convert_tensors.py`.
+    _supports_tensors: bool = True
+
     def __init__(self, *args, device: torch.device = None, **kwargs):
         # super().__init__(*args, **kwargs)
         self.device: Optional[torch.device] = torch.device(device) if device else None
@@ -101,26 +120,43 @@ class TensorSpace(gym.Space, ABC):
                 self._torch_dtype = torch.int64
             else:
                 raise NotImplementedError(f"Space {self} doesn't have a `dtype`?")
-        elif is_numpy_dtype(dtype):
-            self._numpy_dtype = np.dtype(dtype)
-            self._torch_dtype = get_torch_dtype_equivalent_to(dtype)
-        elif is_torch_dtype(dtype):
-            self._numpy_dtype = get_numpy_dtype_equivalent_to(dtype)
-            self._torch_dtype = dtype
-        elif str(dtype) == "float32":
-            self._numpy_dtype = np.dtype(np.float32)
-            self._torch_dtype = torch.float32
         else:
-            assert not any(dtype == k for k in numpy_to_torch_dtypes)
-            assert not any(dtype == k for k in torch_to_numpy_dtypes)
-            raise NotImplementedError(
-                f"Unsupported dtype {dtype} (of type {type(dtype)})"
-            )
+            self._numpy_dtype, self._torch_dtype = _numpy_and_torch_dtypes(dtype)
         if "dtype" in kwargs:
             kwargs["dtype"] = self._numpy_dtype
         super().__init__(*args, **kwargs)
         self.dtype: torch.dtype = self._torch_dtype
 
+    @property
+    def _samples_on_gpu(self) -> bool:
+        """ Wether samples are created directly on the (cuda) device of the space. """
+        return self.device is not None and self.device.type == "cuda"
+
+    def seed(self, seed: Optional[int] = None):
+        seeds = super().seed(seed)
+        # The generator used to sample on the GPU gets re-created from `np_random`.
+        self._torch_generator: Optional[torch.Generator] = None
+        return seeds
+
+    def _get_torch_generator(self) -> torch.Generator:
+        """ Returns the generator used to create samples on the device of the space.
+
+        It is seeded from `self.np_random`, so that seeding the space also makes the
+        samples created on the GPU reproducible.
+        """
+        generator = getattr(self, "_torch_generator", None)
+        if generator is None:
+            generator = torch.Generator(device=self.device)
+            generator.manual_seed(int(self.np_random.randint(2 ** 31)))
+            self._torch_generator = generator
+        return generator
+
+    def __getstate__(self) -> Dict:
+        # NOTE: torch Generators can't be pickled, so it's re-created when needed.
+        state = self.__dict__.copy()
+        state.pop("_torch_generator", None)
+        return state
+
 
 class TensorBox(TensorSpace, spaces.Box):
     """ Box space that accepts both Tensor and ndarrays. """
@@ -132,25 +168,49 @@ class TensorBox(TensorSpace, spaces.Box):
         self.low_tensor = torch.as_tensor(self.low, device=self.device)
         self.high_tensor = torch.as_tensor(self.high, device=self.device)
         self.dtype = self._torch_dtype
+        # Wether all the dimensions are bounded, with a floating-point dtype, in which
+        # case `spaces.Box.sample` just samples uniformly between `low` and `high`.
+        self._sample_uniformly = self._numpy_dtype.kind == "f" and bool(
+            np.isfinite(self.low).all() and np.isfinite(self.high).all()
+        )
 
     def sample(self):
-        self.dtype = self._numpy_dtype
-        sample = super().sample()
-        self.dtype = self._torch_dtype
-        return torch.as_tensor(sample, dtype=self._torch_dtype, device=self.device)
+        if self._samples_on_gpu and getattr(self, "_sample_uniformly", False):
+            # Create the sample directly on the GPU, rather than copying it there.
+            sample = torch.rand(
+                self.shape,
+                dtype=self._torch_dtype,
+                device=self.device,
+                generator=self._get_torch_generator(),
+            )
+            return sample.mul_(self.high_tensor - self.low_tensor).add_(self.low_tensor)
+        if getattr(self, "_sample_uniformly", False):
+            # NOTE: Same as `spaces.Box.sample` in this case, but without having to
+            # temporarily set `self.dtype` to the numpy dtype.
+            sample = self.np_random.uniform(
+                low=self.low, high=self.high, size=self.shape
+            ).astype(self._numpy_dtype)
+        else:
+            self.dtype = self._numpy_dtype
+            sample = super().sample()
+            self.dtype = self._torch_dtype
+        # NOTE: The sample already has the numpy dtype equivalent to `self.dtype`.
+        return torch.as_tensor(sample, device=self.device)
 
     def contains(self, x: Union[list, np.ndarray, Tensor]) -> bool:
         if isinstance(x, list):
             x = np.array(x)  # Promote list to array for contains check
         if isinstance(x, Tensor):
-            return (
-                x.shape == self.shape
-                and (x >= self.low_tensor).all()
-                and (x <= self.high_tensor).all()
+            # NOTE: Only one reduction (and sync with the device) for both bounds.
+            return x.shape == self.shape and bool(
+                (x >= self.low_tensor).logical_and_(x <= self.high_tensor).all()
             )
-        return (
-            x.shape == self.shape and np.all(x >= self.low) and np.all(x <= self.high)
-        )
+        if x.shape != self.shape:
+            return False
+        # NOTE: Only one reduction over the array for both bounds.
+        in_bounds = np.greater_equal(x, self.low)
+        in_bounds &= np.less_equal(x, self.high)
+        return bool(in_bounds.all())
 
     def __repr__(self):
         return (
@@ -174,29 +234,71 @@ class TensorBox(TensorSpace, spaces.Box):
 class TensorDiscrete(TensorSpace, spaces.Discrete):
     def contains(self, v: Union[int, Tensor]) -> bool:
         if isinstance(v, Tensor):
-            v = v.detach().cpu().numpy()
+            # NOTE: Same checks as in `spaces.Discrete.contains`, without moving the
+            # tensor to the CPU.
+            if v.shape != () or v.dtype == torch.bool or v.is_floating_point():
+                return False
+            return bool((v >= 0).logical_and_(v < self.n))
         return super().contains(v)
 
     def sample(self):
-        self.dtype = self._numpy_dtype
-        s = super().sample()
-        self.dtype = self._torch_dtype
-        return torch.as_tensor(s, dtype=self.dtype, device=self.device)
+        if self._samples_on_gpu:
+            return torch.randint(
+                self.n,
+                (),
+                dtype=self._torch_dtype,
+                device=self.device,
+                generator=self._get_torch_generator(),
+            )
+        # NOTE: Same as `spaces.Discrete.sample`.
+        s = self.np_random.randint(self.n)
+        return torch.as_tensor(s, dtype=self._torch_dtype, device=self.device)
 
 
 class TensorMultiDiscrete(TensorSpace, spaces.MultiDiscrete):
+    def __init__(self, nvec, *args, device: torch.device = None, **kwargs):
+        nvec_tensor: Optional[Tensor] = None
+        if isinstance(nvec, Tensor):
+            # NOTE: `spaces.MultiDiscrete` still needs `nvec` as a numpy array, but we
+            # keep the tensor, so it doesn't have to be copied back to the device.
+            nvec_tensor = nvec
+            nvec = nvec.detach().cpu().numpy()
+        super().__init__(nvec, *args, device=device, **kwargs)
+        if nvec_tensor is not None:
+            self._nvec_tensor = nvec_tensor.to(device=self.device, dtype=torch.int64)
+
+    def _get_nvec_tensor(self) -> Tensor:
+        nvec = getattr(self, "_nvec_tensor", None)
+        if nvec is None:
+            nvec = torch.as_tensor(self.nvec, device=self.device)
+            self._nvec_tensor = nvec
+        return nvec
+
     def contains(self, v: Tensor) -> bool:
-        try:
-            return super().contains(v)
-        except:
-            v_numpy = v.detach().cpu().numpy()
-            return super().contains(v_numpy)
+        if isinstance(v, Tensor):
+            # NOTE: Same checks as in `spaces.MultiDiscrete.contains`, without moving
+            # the tensor to the CPU.
+            if v.shape != self.shape:
+                return False
+            nvec = self._get_nvec_tensor().to(v.device)
+            return bool((v >= 0).logical_and_(v < nvec).all())
+        return super().contains(v)
 
     def sample(self):
-        self.dtype = self._numpy_dtype
-        s = super().sample()
-        self.dtype = self._torch_dtype
-        return torch.as_tensor(s, dtype=self.dtype, device=self.device)
+        if self._samples_on_gpu:
+            nvec = self._get_nvec_tensor()
+            uniform = torch.rand(
+                self.nvec.shape,
+                device=self.device,
+                generator=self._get_torch_generator(),
+            )
+            return (uniform * nvec).floor_().to(self._torch_dtype)
+        # NOTE: Same as `spaces.MultiDiscrete.sample`, but using the numpy dtype
+        # directly, rather than temporarily setting it as `self.dtype`.
+        s = (self.np_random.random_sample(self.nvec.shape) * self.nvec).astype(
+            self._numpy_dtype
+        )
+        return torch.as_tensor(s, device=self.device)
 
 
 from gym.vector.utils.spaces import batch_space
@@ -205,3 +307,19 @@ from gym.vector.utils.spaces import batch_space
 @batch_space.register(TensorDiscrete)
 def _batch_discrete_space(space: TensorDiscrete, n: int = 1) -> TensorMultiDiscrete:
     return TensorMultiDiscrete(torch.full((n,), space.n, dtype=space.dtype))
+
+
+@batch_space.register(TensorBox)
+def _batch_tensor_box_space(space: TensorBox, n: int = 1) -> TensorBox:
+    repeats = [n] + [1] * space.low.ndim
+    low, high = np.tile(space.low, repeats), np.tile(space.high, repeats)
+    if space.device is None or space.device.type == "cpu":
+        return type(space)(low, high, dtype=space._numpy_dtype, device=space.device)
+    # Create the batched space on the CPU (where the bounds don't need to be copied),
+    # and expand the bounds that are already on the device, rather than copying the
+    # tiled bounds from the host.
+    batched = type(space)(low, high, dtype=space._numpy_dtype)
+    batched.device = space.device
+    batched.low_tensor = space.low_tensor.expand(n, *space.shape).contiguous()
+    batched.high_tensor = space.high_tensor.expand(n, *space.shape).contiguous()
+    return batched
@@ -18,3 +18,64 @@ def test_tensor_box(np_dtype: np.dtype):
     assert sample in new_space
     assert sample.cpu().numpy().astype(np_dtype) in space
     assert sample.dtype == torch_dtype
+
+
+@pytest.mark.parametrize(
+    "space",
+    [
+        spaces.Box(0, 1, shape=(2, 3), dtype=np.float32),
+        spaces.Box(-np.inf, np.inf, shape=(4,), dtype=np.float32),
+        spaces.Box(0, 255, shape=(2, 2), dtype=np.uint8),
+        spaces.Discrete(5),
+        spaces.MultiDiscrete([2, 3, 4]),
+    ],
+)
+def test_samples_match_those_of_gym_spaces(space: spaces.Space):
+    """ Tensor spaces produce the same samples as the gym spaces, given the same seed.
+    """
+    from .tensor_spaces import TensorDiscrete, TensorMultiDiscrete
+
+    if isinstance(space, spaces.Box):
+        tensor_space = TensorBox(space.low, space.high, space.shape, dtype=space.dtype)
+    elif isinstance(space, spaces.Discrete):
+        tensor_space = TensorDiscrete(space.n)
+    else:
+        tensor_space = TensorMultiDiscrete(space.nvec)
+    space.seed(123)
+    tensor_space.seed(123)
+    for _ in range(3):
+        expected = space.sample()
+        sample = tensor_space.sample()
+        assert isinstance(sample, Tensor)
+        assert sample.dtype == tensor_space.dtype
+        assert np.array_equal(sample.numpy(), expected)
+        assert sample in tensor_space
+
+
+def test_batch_tensor_box():
+    from gym.vector.utils import batch_space
+
+    space = TensorBox(0, 1, (2, 3), dtype=np.float32)
+    batched = batch_space(space, n=4)
+    assert isinstance(batched, TensorBox)
+    assert batched.shape == (4, 2, 3)
+    assert batched.dtype == torch.float32
+    assert batched.low_tensor.shape == batched.high_tensor.shape == (4, 2, 3)
+    assert batched.sample() in batched
+
+
+def test_discrete_spaces_contain_tensors():
+    from .tensor_spaces import TensorDiscrete, TensorMultiDiscrete
+
+    space = TensorDiscrete(3)
+    assert torch.as_tensor(2) in space
+    assert torch.as_tensor(3) not in space
+    assert torch.as_tensor(-1) not in space
+    assert torch.as_tensor(1.0) not in space
+    assert torch.as_tensor([1]) not in space
+
+    space = TensorMultiDiscrete([2, 3, 4])
+    assert torch.as_tensor([1, 2, 3]) in space
+    assert torch.as_tensor([1, 3, 3]) not in space
+    assert torch.as_tensor([-1, 0, 0]) not in space
+    assert torch.as_tensor([1, 2]) not in space
@@ -1,3 +1,5 @@
+from enum import Enum
+from functools import wraps
 from typing import Callable, List, TypeVar, Union, Tuple, Optional, Sequence
 
 import gym
@@ -30,18 +32,30 @@ class Compose(List[T], ComposeBase, Transform[InputType, OutputType]):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         ComposeBase.__init__(self, transforms=self)
-    
-    
+        self._resolved: Optional[List[Callable]] = None
+
+    def _resolve(self) -> List[Callable]:
+        """ Returns the transforms, where members of the `Transforms` enum are replaced
+        with their value, so that calling them doesn't go through the enum.
+
+        This is cached, and the cache is cleared whenever the list is modified.
+        """
+        resolved = getattr(self, "_resolved", None)
+        if resolved is None:
+            resolved = [t.value if isinstance(t, Enum) else t for t in self]
+            self._resolved = resolved
+        return resolved
+
     def __call__(self, img):
         if isinstance(img, spaces.Space):
-            for t in self:
+            for t in self._resolve():
                 try:
                     img = t(img)
                 except:
                     logger.debug(f"Unable to apply transform {t} on space {img}: assuming that transform {t} doesn't change the space.")
             return img
         else:
-            for t in self:
+            for t in self._resolve():
                 img = t(img)
             return img
 
@@ -69,4 +83,33 @@ class Compose(List[T], ComposeBase, Transform[InputType, OutputType]):
     #         if isinstance(transform, Transforms):
     #             transform = transform.value
     #         input_space = transform(input_space)
-    #     return input_space
\ No newline at end of file
+    #     return input_space
+
+def _clears_resolved_transforms(method: Callable) -> Callable:
+    @wraps(method)
+    def _wrapper(self: Compose, *args, **kwargs):
+        self._resolved = None
+        return method(self, *args, **kwargs)
+
+    return _wrapper
+
+
+# Clear the cache of resolved transforms whenever the list is modified in-place.
+for _method_name in (
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+):
+    setattr(
+        Compose, _method_name, _clears_resolved_transforms(getattr(list, _method_name))
+    )
+del _method_name
@@ -29,29 +29,75 @@ from .transform import Img, Transform
 from .channels import channels_first_if_needed
 logger = get_logger(__file__)
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+def _hwc_uint8_to_chw_float32(src: np.ndarray, dst: np.ndarray) -> None:
+    """ Writes the uint8 image `src` of shape [H, W, C] into the float32 array `dst`
+    of shape [C, H, W], divided by 255, in a single pass over the image.
+    """
+    height, width, channels = src.shape
+    for c in prange(channels):
+        for y in range(height):
+            for x in range(width):
+                dst[c, y, x] = np.float32(src[y, x, c]) / np.float32(255.0)
+
+
+def _nhwc_uint8_to_nchw_float32(src: np.ndarray, dst: np.ndarray) -> None:
+    """ Batched version of `_hwc_uint8_to_chw_float32`, for `src` of shape
+    [N, H, W, C] and `dst` of shape [N, C, H, W].
+    """
+    n, height, width, channels = src.shape
+    for i in prange(n):
+        for c in range(channels):
+            for y in range(height):
+                for x in range(width):
+                    dst[i, c, y, x] = np.float32(src[i, y, x, c]) / np.float32(255.0)
+
+
+if njit is not None:
+    _hwc_uint8_to_chw_float32 = njit(parallel=True, cache=True)(
+        _hwc_uint8_to_chw_float32
+    )
+    _nhwc_uint8_to_nchw_float32 = njit(parallel=True, cache=True)(
+        _nhwc_uint8_to_nchw_float32
+    )
+
 
 def copy_if_negative_strides(image: Img) -> Img:
     # It sometimes happens when taking images from a gym env that the strides
     # are negative, for some reason. Therefore we need to copy the array
     # before we can call torchvision.transforms.functional.to_tensor(image).
+    if type(image) is np.ndarray:
+        # Fast path for the (most common) case of frames from gym envs.
+        if min(image.strides, default=0) < 0:
+            return np.ascontiguousarray(image)
+        return image
     if isinstance(image, Image):
-        image = np.array(image)
+        # NOTE: This usually doesn't copy the image, but the array is then read-only.
+        image = np.asarray(image)
 
     if isinstance(image, np.ndarray):
         strides = image.strides
     elif isinstance(image, Tensor):
-        strides = image.stride()
+        # NOTE: Tensors can't have negative strides.
+        return image
     elif hasattr(image, "strides"):
         strides = image.strides
     else:
         raise NotImplementedError(f"Can't get strides of object {image}")
-    if any(s < 0 for s in strides):
+    if min(strides, default=0) < 0:
         return image.copy()
     return image
 
 
-@singledispatch
-def image_to_tensor(image: Union[Img, Sequence[Img], gym.Space]) -> Union[Tensor, gym.Space]:
+def image_to_tensor(
+    image: Union[Img, Sequence[Img], gym.Space], *args, **kwargs
+) -> Union[Tensor, gym.Space]:
     """
     Converts a PIL Image or numpy.ndarray ((N) x H x W x C) in the range
     [0, 255] to a torch.FloatTensor of shape ((N) x C x H x W) in the range
@@ -68,8 +114,39 @@ def image_to_tensor(image: Union[Img, Sequence[Img], gym.Space]) -> Union[Tensor
     Tensor
         [description]
     """
+    # NOTE: This is called on every frame, so we look up the handler for the exact
+    # type of the input in a dict first, rather than going through singledispatch.
+    image_type = type(image)
+    handler = _image_to_tensor_handlers.get(image_type)
+    if handler is None:
+        handler = _image_to_tensor_dispatch.dispatch(image_type)
+        _image_to_tensor_handlers[image_type] = handler
+    return handler(image, *args, **kwargs)
+
+
+@singledispatch
+def _image_to_tensor_dispatch(
+    image: Union[Img, Sequence[Img], gym.Space], *args, **kwargs
+) -> Union[Tensor, gym.Space]:
     raise NotImplementedError(f"Don't know how to convert {image} to a Tensor.")
 
+
+# Handler to use for each type of input to `image_to_tensor`.
+_image_to_tensor_handlers: Dict[type, Callable] = {}
+
+
+def _register_image_to_tensor_handler(cls, func: Callable = None) -> Callable:
+    """ Same as `singledispatch.register`, but also clears the handler cache. """
+    if func is None and isinstance(cls, type):
+        return lambda f: _register_image_to_tensor_handler(cls, f)
+    _image_to_tensor_handlers.clear()
+    return _image_to_tensor_dispatch.register(cls, func)
+
+
+image_to_tensor.register = _register_image_to_tensor_handler
+image_to_tensor.dispatch = _image_to_tensor_dispatch.dispatch
+image_to_tensor.registry = _image_to_tensor_dispatch.registry
+
 # @image_to_tensor.register
 # def _(image: Tensor) -> Tensor:
 #     return channels_first_if_needed(image)
@@ -80,11 +157,32 @@ def image_to_tensor(image: Union[Img, Sequence[Img], gym.Space]) -> Union[Tensor
 def _(image: Union[Image, np.ndarray]) -> Tensor:
     """ Converts a PIL Image, or np.uint8 ndarray to a Tensor. Also reshapes it
     to channels_first format (because ToTensor from torchvision does it also).
-    """    
+    """
     from .channels import (channels_first_if_needed, channels_last_if_needed,
                            has_channels_first, has_channels_last)
     image = copy_if_negative_strides(image)
 
+    if (
+        njit is not None
+        and isinstance(image, np.ndarray)
+        and image.ndim in (3, 4)
+        and image.dtype == np.uint8
+        and has_channels_last(image)
+    ):
+        # Transpose, convert to float and rescale the image(s) at the same time.
+        *batch_dims, height, width, channels = image.shape
+        out = np.empty((*batch_dims, channels, height, width), dtype=np.float32)
+        if batch_dims:
+            _nhwc_uint8_to_nchw_float32(image, out)
+        else:
+            _hwc_uint8_to_chw_float32(image, out)
+        return torch.from_numpy(out)
+
+    if isinstance(image, np.ndarray) and not image.flags.writeable:
+        # NOTE: Arrays that share their memory with a PIL image are read-only, and
+        # torch doesn't support non-writeable arrays.
+        image = image.copy()
+
     if len(image.shape) == 2:
         return F.to_tensor(image)
 
@@ -111,6 +209,13 @@ def _(image: Union[Image, np.ndarray]) -> Tensor:
 
 @image_to_tensor.register(list)
 def _list_of_images_to_tensor(image: Sequence[Img]) -> Tensor:
+    if (
+        image
+        and all(type(img) is np.ndarray and img.ndim == 3 for img in image)
+        and len(set((img.shape, img.dtype) for img in image)) == 1
+    ):
+        # Stack the images first, so they are all converted at once.
+        return image_to_tensor(np.stack(image))
     return torch.stack(list(map(image_to_tensor, image)))
 
 
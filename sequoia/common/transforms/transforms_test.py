@@ -120,6 +120,23 @@ def test_to_tensor(transform: Transforms, input_shape, output_shape):
     assert transform(input_space) == output_space
 
 
+@pytest.mark.parametrize("input_shape", [(9, 12, 3), (9, 12, 1)])
+def test_to_tensor_values(input_shape: Tuple[int, ...]):
+    x = np.random.randint(0, 255, input_shape, dtype=np.uint8)
+    y = Transforms.to_tensor(x)
+    expected = torch.from_numpy(x).permute(2, 0, 1).float().div(255)
+    assert y.dtype == torch.float32
+    assert y.is_contiguous()
+    assert torch.equal(y, expected)
+
+
+def test_to_tensor_on_batch_of_images():
+    images = [np.random.randint(0, 255, (9, 12, 3), dtype=np.uint8) for _ in range(4)]
+    expected = torch.stack([Transforms.to_tensor(image) for image in images])
+    assert torch.equal(Transforms.to_tensor(images), expected)
+    assert torch.equal(Transforms.to_tensor(np.stack(images)), expected)
+
+
 @pytest.mark.parametrize("transform, input_shape", [
     (Transforms.channels_last_if_needed, (7, 12, 13)),
 ])
@@ -143,6 +160,18 @@ def test_compose_applied_on_shape():
     assert x.shape == transform(start_shape)
     assert x.shape == transform(start_shape) == (3, 9, 9)
 
+
+def test_compose_uses_transforms_added_after_a_call():
+    transform = Compose([Transforms.channels_first])
+    assert transform((9, 12, 3)) == (3, 9, 12)
+    transform.append(Transforms.channels_last)
+    assert transform((9, 12, 3)) == (9, 12, 3)
+    transform += [Transforms.channels_first]
+    assert transform((9, 12, 3)) == (3, 9, 12)
+    del transform[1:]
+    assert transform((9, 12, 3)) == (3, 9, 12)
+    assert Transforms.channels_first in transform
+
 import gym
 from sequoia.common.gym_wrappers import (PixelObservationWrapper,
                                          TransformObservation)
@@ -1,18 +1,106 @@
-from abc import ABC, abstractmethod
-from typing import Any, Tuple
+from dataclasses import dataclass
+from math import factorial
+from typing import ClassVar, Dict, Set, Tuple
 
 import torch
 from torch import Tensor, nn
 from torch.nn import functional as F
 
+from sequoia.common.loss import Loss
+from sequoia.common.metrics import get_metrics
+
 from .auxiliary_task import AuxiliaryTask
 
 
 class JigsawPuzzleTask(AuxiliaryTask):
-    def get_loss(self,
-                 x: Tensor,
-                 h_x: Tensor,
-                 y_pred: Tensor,
-                 y: Tensor=None) -> Tensor:
-        return torch.zeros(1)
-        raise NotImplementedError("TODO")
\ No newline at end of file
+    """ Splits the images into a grid of tiles, shuffles the tiles using one of a fixed
+    set of permutations, and predicts which permutation was used from the features of
+    the shuffled images.
+
+    The tiles of the whole batch are shuffled at once (with `unfold`, `gather` and
+    `fold`), rather than image per image.
+    """
+    name: ClassVar[str] = "jigsaw_puzzle"
+
+    @dataclass
+    class Options(AuxiliaryTask.Options):
+        """ Options for the Jigsaw puzzle auxiliary task. """
+        # Number of tiles along each side of the (square) grid of tiles.
+        grid_size: int = 3
+        # Number of permutations of the tiles to choose from (number of classes).
+        num_permutations: int = 24
+
+    def __init__(
+        self,
+        *args,
+        name: str = None,
+        options: "JigsawPuzzleTask.Options" = None,
+        **kwargs,
+    ):
+        super().__init__(*args, name=name, options=options, **kwargs)
+        self.options: JigsawPuzzleTask.Options
+        n_tiles = self.options.grid_size ** 2
+        # NOTE: The permutations are the same every time (the first one being the
+        # identity), and are moved to the right device along with the module.
+        generator = torch.Generator().manual_seed(123)
+        permutations = [torch.arange(n_tiles)]
+        seen: Set[Tuple[int, ...]] = {tuple(permutations[0].tolist())}
+        num_permutations = min(self.options.num_permutations, factorial(n_tiles))
+        while len(permutations) < num_permutations:
+            permutation = torch.randperm(n_tiles, generator=generator)
+            if tuple(permutation.tolist()) not in seen:
+                seen.add(tuple(permutation.tolist()))
+                permutations.append(permutation)
+        self.register_buffer("permutations", torch.stack(permutations))
+        self.auxiliary_layer = nn.Sequential(
+            nn.Flatten(),
+            nn.Linear(AuxiliaryTask.hidden_size, num_permutations),
+        )
+
+    def get_loss(self, forward_pass: Dict[str, Tensor], y: Tensor = None) -> Loss:
+        x = forward_pass["x"]
+        batch_size = x.shape[0]
+        # Pick a random permutation of the tiles for each image.
+        permutation_ids = torch.randint(
+            len(self.permutations), (batch_size,), device=x.device
+        )
+        x_t = self.shuffle_tiles(x, self.permutations[permutation_ids])
+        h_x_t = self.encode(x_t)
+        logits = self.auxiliary_layer(h_x_t)
+
+        loss = Loss(self.name)
+        loss.loss = F.cross_entropy(logits, permutation_ids)
+        loss.metrics[self.name] = get_metrics(
+            x=x_t, h_x=h_x_t, y_pred=logits, y=permutation_ids
+        )
+        return loss
+
+    def shuffle_tiles(self, x: Tensor, permutations: Tensor) -> Tensor:
+        """ Re-orders the tiles of each image in the batch `x` of shape [B, C, H, W],
+        using the corresponding permutation in `permutations` of shape [B, n_tiles].
+
+        When the height or width isn't a multiple of the grid size, the remaining
+        pixels (on the bottom and right edges) are left in place.
+        """
+        n = self.options.grid_size
+        height, width = x.shape[-2:]
+        tile_size = (height // n, width // n)
+        cropped_size = (tile_size[0] * n, tile_size[1] * n)
+        # Tiles have shape [B, C * tile_h * tile_w, n_tiles].
+        tiles = F.unfold(
+            x[..., : cropped_size[0], : cropped_size[1]],
+            kernel_size=tile_size,
+            stride=tile_size,
+        )
+        index = permutations.unsqueeze(1).expand(-1, tiles.shape[1], -1)
+        shuffled = F.fold(
+            tiles.gather(2, index),
+            output_size=cropped_size,
+            kernel_size=tile_size,
+            stride=tile_size,
+        )
+        if cropped_size == (height, width):
+            return shuffled
+        x_t = x.clone()
+        x_t[..., : cropped_size[0], : cropped_size[1]] = shuffled
+        return x_t
@@ -0,0 +1,65 @@
+import pytest
+import torch
+from torch import nn
+
+from .auxiliary_task import AuxiliaryTask
+from .jigsaw_puzzle import JigsawPuzzleTask
+
+HIDDEN_SIZE = 16
+
+
+@pytest.fixture(autouse=True)
+def encoder(monkeypatch) -> nn.Module:
+    """ Sets the (shared) encoder and hidden size used by the auxiliary tasks, which
+    are normally set by the model.
+    """
+    encoder = nn.Sequential(nn.Flatten(), nn.Linear(3 * 9 * 9, HIDDEN_SIZE))
+    monkeypatch.setattr(AuxiliaryTask, "hidden_size", HIDDEN_SIZE, raising=False)
+    monkeypatch.setattr(AuxiliaryTask, "encoder", encoder, raising=False)
+    return encoder
+
+
+def test_options_can_be_passed_as_kwargs():
+    task = JigsawPuzzleTask(coefficient=0.1, grid_size=2)
+    assert task.options.coefficient == 0.1
+    assert task.options.grid_size == 2
+    # There are only 4! = 24 permutations of 4 tiles.
+    assert task.permutations.shape == (24, 4)
+    assert (task.permutations[0] == torch.arange(4)).all()
+
+
+def test_shuffle_tiles_with_identity_permutation():
+    task = JigsawPuzzleTask(grid_size=3)
+    x = torch.rand([2, 3, 10, 11])
+    identity = torch.arange(9).expand(2, -1)
+    assert (task.shuffle_tiles(x, identity) == x).all()
+
+
+def test_shuffle_tiles_moves_tiles():
+    task = JigsawPuzzleTask(grid_size=2)
+    # Image with 2x2 tiles of 2x2 pixels, where each tile is filled with its index,
+    # plus an extra row and column on the edges, which should be left in place.
+    x = torch.full([1, 1, 5, 5], -1.0)
+    for i in range(2):
+        for j in range(2):
+            x[..., 2 * i : 2 * i + 2, 2 * j : 2 * j + 2] = 2 * i + j
+    # Tile `k` of the output is tile `permutation[k]` of the input.
+    permutation = torch.as_tensor([[3, 2, 1, 0]])
+    x_t = task.shuffle_tiles(x, permutation)
+    expected = torch.full([1, 1, 5, 5], -1.0)
+    for i in range(2):
+        for j in range(2):
+            expected[..., 2 * i : 2 * i + 2, 2 * j : 2 * j + 2] = 3 - (2 * i + j)
+    assert (x_t == expected).all()
+    # The input isn't modified.
+    assert x[0, 0, 0, 0] == 0
+
+
+def test_get_loss(encoder: nn.Module):
+    task = JigsawPuzzleTask(grid_size=3, num_permutations=10)
+    x = torch.rand([4, 3, 9, 9])
+    loss = task.get_loss({"x": x})
+    assert loss.name == task.name
+    assert torch.isfinite(loss.loss)
+    loss.loss.backward()
+    assert encoder[1].weight.grad is not None
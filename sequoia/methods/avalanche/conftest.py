@@ -39,13 +39,14 @@ def fast_scenario(use_task_labels=False, shuffle=True):
         n_features=6,
         n_informative=6,
         n_redundant=0,
+        random_state=123,
     )
 
-    X = torch.from_numpy(dataset[0]).float()
-    y = torch.from_numpy(dataset[1]).long()
+    X = torch.as_tensor(dataset[0], dtype=torch.float32)
+    y = torch.as_tensor(dataset[1], dtype=torch.int64)
 
     train_X, test_X, train_y, test_y = train_test_split(
-        X, y, train_size=0.6, shuffle=True, stratify=y
+        X, y, train_size=0.6, shuffle=True, stratify=y, random_state=123
     )
 
     train_dataset = TensorDataset(train_X, train_y)
@@ -6,8 +6,9 @@ See `avalanche.training.plugins.gdumb.GDumbPlugin` or
 BUG: There appears to be a bug in the GDumb plugin, caused by a mismatch in the tensor
 shapes when concatenating them into a TensorDataset, when batch size > 1.
 """
+import heapq
 from dataclasses import dataclass
-from typing import ClassVar, Type, Optional, Any, Dict, List, Tuple
+from typing import ClassVar, Type, Optional, Any, Dict, List
 from collections import defaultdict
 import torch
 import tqdm
@@ -27,20 +28,80 @@ from .base import AvalancheMethod
 logger = get_logger(__file__)
 
 
+class _TaskMemory:
+    """ Buffer for the patterns and targets of one task, preallocated for `mem_size`
+    entries, so that adding or replacing a pattern is a single write into it.
+    """
+
+    def __init__(
+        self, mem_size: int, pattern: Tensor, target: Tensor, quantize: bool = False
+    ):
+        # When `quantize` is True, the patterns (which must be in [0, 1]) are stored as
+        # uint8, which takes 4x less memory than float32.
+        self.quantize = quantize
+        self.patterns = pattern.new_empty(
+            (mem_size, *pattern.shape), dtype=torch.uint8 if quantize else None
+        )
+        self.targets = target.new_empty((mem_size, *target.shape))
+        self.size = 0
+        # Heap of the indices of the entries of each class, so that the first entry of
+        # a given class can be found without a scan of the buffer.
+        self.class_indices: Dict[Any, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, pattern: Tensor, target: Tensor, target_value: Any) -> None:
+        pattern = self._to_stored_pattern(pattern)
+        index = self.size
+        self.size += 1
+        self._write(index, pattern, target, target_value)
+
+    def replace(
+        self, to_remove: Any, pattern: Tensor, target: Tensor, target_value: Any
+    ) -> None:
+        """ Replaces the first entry of class `to_remove` with the given pattern. """
+        pattern = self._to_stored_pattern(pattern)
+        index = heapq.heappop(self.class_indices[to_remove])
+        self._write(index, pattern, target, target_value)
+
+    def _to_stored_pattern(self, pattern: Tensor) -> Tensor:
+        if not self.quantize:
+            return pattern
+        if pattern.min() < 0 or pattern.max() > 1:
+            raise RuntimeError(
+                f"Can only quantize patterns with values in the [0, 1] range, but got "
+                f"values in [{pattern.min()}, {pattern.max()}]. Set `quantize` to "
+                f"False to store the patterns as they are."
+            )
+        return pattern.mul(255).round_()
+
+    def _write(self, index: int, pattern: Tensor, target: Tensor, target_value: Any):
+        self.patterns[index] = pattern
+        self.targets[index] = target
+        heapq.heappush(self.class_indices[target_value], index)
+
+    def dataset(self) -> TensorDataset:
+        # NOTE: These are views of the buffer, not copies.
+        return TensorDataset(self.patterns[: self.size], self.targets[: self.size])
+
+
 class GDumbPlugin(_GDumbPlugin):
     """ Patched version of the GDumbPlugin from Avalanche.
 
     The base implementation is quite inefficient: for each new item, it does an entire
     concatenation with the current dataset.
-    This uses lists instead, and only concatenates once.
+    This uses a preallocated buffer per task instead, where new items are written
+    in-place, and doesn't need to concatenate anything.
 
     It also uses the task labels from each sample in the dataset, rather than from the
     current experience, as there might be more than one task in the dataset.
     """
 
-    def __init__(self, mem_size: int = 200):
+    def __init__(self, mem_size: int = 200, quantize: bool = False):
         super().__init__(mem_size=mem_size)
-        self.ext_mem: Dict[Any, Tuple[List[Tensor], List[Tensor]]] = {}
+        self.quantize = quantize
+        self.ext_mem: Dict[Any, _TaskMemory] = {}
         # count occurrences for each class
         self.counter: Dict[Any, Dict[Any, int]] = {}
 
@@ -61,7 +122,12 @@ class GDumbPlugin(_GDumbPlugin):
                 pattern = pattern.unsqueeze(0)
 
             current_counter = self.counter.setdefault(task_id, defaultdict(int))
-            current_mem = self.ext_mem.setdefault(task_id, ([], []))
+            current_mem = self.ext_mem.get(task_id)
+            if current_mem is None:
+                current_mem = _TaskMemory(
+                    self.mem_size, pattern, target, quantize=self.quantize
+                )
+                self.ext_mem[task_id] = current_mem
 
             if current_counter == {}:
                 # any positive (>0) number is ok
@@ -78,36 +144,19 @@ class GDumbPlugin(_GDumbPlugin):
                     # full memory: replace item from most represented class
                     # with current pattern
                     to_remove = max(current_counter, key=current_counter.get)
-
-                    # dataset_size = len(current_mem)
-                    # for j in range(dataset_size):
-                    #     if current_mem.tensors[1][j].item() == to_remove:
-                    #         current_mem.tensors[0][j] = pattern
-                    #         current_mem.tensors[1][j] = target
-                    #         break
-
-                    dataset_size = len(current_mem[0])
-                    for j in range(dataset_size):
-                        if current_mem[1][j].item() == to_remove:
-                            current_mem[0][j] = pattern
-                            current_mem[1][j] = target
-                            break
+                    current_mem.replace(to_remove, pattern, target, target_value)
                     current_counter[to_remove] -= 1
                 else:
                     # memory not full: add new pattern
-                    current_mem[0].append(pattern)
-                    current_mem[1].append(target)
+                    current_mem.add(pattern, target, target_value)
 
                 # Indicate that we've changed the number of stored instances of this
                 # class.
                 current_counter[target_value] += 1
 
         task_datasets: Dict[Any, TensorDataset] = {}
-        for task_id, task_mem_tuple in self.ext_mem.items():
-            patterns, targets = task_mem_tuple
-            task_dataset = TensorDataset(
-                torch.stack(patterns, dim=0), torch.stack(targets, dim=0)
-            )
+        for task_id, task_mem in self.ext_mem.items():
+            task_dataset = task_mem.dataset()
             task_datasets[task_id] = task_dataset
             logger.debug(
                 f"There are {len(task_dataset)} entries from task {task_id} in the new "
@@ -117,6 +166,13 @@ class GDumbPlugin(_GDumbPlugin):
         adapted_dataset = AvalancheConcatDataset(task_datasets.values())
         strategy.adapted_dataset = adapted_dataset
 
+    def before_forward(self, strategy: BaseStrategy, **kwargs):
+        """ Converts the quantized patterns from the buffer back to floats, once they
+        are already on the device.
+        """
+        if self.quantize and strategy.mb_x.dtype == torch.uint8:
+            strategy.mb_x = strategy.mb_x.float().div_(255)
+
 
 @register_method
 @dataclass
@@ -136,6 +192,10 @@ class GDumbMethod(AvalancheMethod[GDumb]):
     # The number of training epochs.
     train_epochs: int = uniform(1, 100, default=20)
 
+    # Wether to store the images in the buffer as uint8 rather than as floats, which
+    # takes 4x less memory. Only use this when the inputs are in the [0, 1] range.
+    quantize: bool = False
+
     strategy_class: ClassVar[Type[BaseStrategy]] = GDumb
 
     def create_cl_strategy(self, setting: ClassIncrementalSetting) -> GDumb:
@@ -153,7 +213,9 @@ class GDumbMethod(AvalancheMethod[GDumb]):
         old_gdumb_plugin: _GDumbPlugin = strategy.plugins.pop(old_gdumb_plugin_index)
         logger.info("Replacing the GDumbPlugin with our 'patched' version.")
 
-        new_gdumb_plugin = GDumbPlugin(mem_size=old_gdumb_plugin.mem_size)
+        new_gdumb_plugin = GDumbPlugin(
+            mem_size=old_gdumb_plugin.mem_size, quantize=self.quantize
+        )
         # NOTE: Might not be necessarily, since those should be empty, but here we also
         # copy the state from the old plugin to the new one.
         new_gdumb_plugin.ext_mem = old_gdumb_plugin.ext_mem
@@ -1,12 +1,95 @@
-""" WIP: Tests for the GDumb Method.
+""" WIP: Tests for the GDumb Method. """
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, ClassVar, Dict, List, Type
+
+import pytest
+import torch
+from torch import Tensor
 
-For now this only inherits the tests from the AvalancheMethod class.
-"""
-from typing import ClassVar, Type
 from .base import AvalancheMethod
-from .gdumb import GDumbMethod
+from .gdumb import GDumbMethod, GDumbPlugin, _TaskMemory
 from .base_test import _TestAvalancheMethod
 
 
 class TestGDumbMethod(_TestAvalancheMethod):
     Method: ClassVar[Type[AvalancheMethod]] = GDumbMethod
+
+
+def _list_based_gdumb_memory(dataset, mem_size: int):
+    """ Reference implementation of the GDumb buffer, with lists (like in the previous
+    version of the GDumbPlugin), for a dataset of (pattern, target) tuples.
+    """
+    patterns: List[Tensor] = []
+    targets: List[Tensor] = []
+    counter: Dict[Any, int] = defaultdict(int)
+    for pattern, target in dataset:
+        target_value = target.item()
+        patterns_per_class = int(mem_size / len(counter)) if counter else 1
+        if target_value in counter and counter[target_value] >= patterns_per_class:
+            continue
+        if sum(counter.values()) >= mem_size:
+            to_remove = max(counter, key=counter.get)
+            for j, stored_target in enumerate(targets):
+                if stored_target.item() == to_remove:
+                    patterns[j] = pattern
+                    targets[j] = target
+                    break
+            counter[to_remove] -= 1
+        else:
+            patterns.append(pattern)
+            targets.append(target)
+        counter[target_value] += 1
+    return torch.stack(patterns), torch.stack(targets)
+
+
+def test_gdumb_buffer_matches_list_based_version():
+    """ Entries of the most represented class get replaced in the same order as with
+    the previous (list-based) version of the buffer.
+    """
+    generator = torch.Generator().manual_seed(123)
+    # Lots of entries from class 0 at first, so that they get replaced afterwards.
+    targets = torch.cat(
+        [
+            torch.zeros(10, dtype=torch.long),
+            torch.randint(5, (90,), generator=generator),
+        ]
+    )
+    patterns = torch.rand([100, 1, 4, 4], generator=generator)
+    dataset = list(zip(patterns, targets))
+
+    plugin = GDumbPlugin(mem_size=12)
+    strategy = SimpleNamespace(
+        experience=SimpleNamespace(
+            dataset=[(pattern, target, 0) for pattern, target in dataset]
+        )
+    )
+    plugin.after_train_dataset_adaptation(strategy)
+
+    expected_patterns, expected_targets = _list_based_gdumb_memory(dataset, 12)
+    memory_patterns, memory_targets = plugin.ext_mem[0].dataset().tensors
+    assert (memory_targets == expected_targets).all()
+    assert (memory_patterns == expected_patterns).all()
+
+
+def test_quantized_buffer():
+    """ The quantized buffer stores the patterns as uint8, and `before_forward` converts
+    them back to floats.
+    """
+    patterns = torch.rand([3, 1, 4, 4])
+    memory = _TaskMemory(3, patterns[0], torch.as_tensor(0), quantize=True)
+    for pattern in patterns:
+        memory.add(pattern, torch.as_tensor(0), 0)
+    stored_patterns, _ = memory.dataset().tensors
+    assert stored_patterns.dtype == torch.uint8
+
+    plugin = GDumbPlugin(mem_size=3, quantize=True)
+    strategy = SimpleNamespace(mb_x=stored_patterns)
+    plugin.before_forward(strategy)
+    assert strategy.mb_x.dtype == torch.float32
+    assert (strategy.mb_x - patterns).abs().max() <= 0.5 / 255 + 1e-6
+
+    # Patterns outside of the [0, 1] range can't be quantized.
+    with pytest.raises(RuntimeError):
+        memory.replace(0, patterns[0] * 2, torch.as_tensor(0), 0)
+    assert len(memory.class_indices[0]) == 3
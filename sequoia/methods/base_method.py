@@ -8,10 +8,13 @@ methods.
 TODO: Add a wrapper to limit the 'epoch' length in RL, and then use an early-stopping
 callback to also perform validation like in SL.
 """
+import copy
 import json
 import operator
+import shlex
 import warnings
 from dataclasses import dataclass, is_dataclass, fields
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type, Union
 
@@ -47,6 +50,27 @@ from sequoia.common.gym_wrappers.utils import IterableWrapper, has_wrapper
 from sequoia.settings.rl.continual.environment import GymDataLoader
 
 
+@lru_cache(maxsize=32)
+def _parse_args(parseable_type: Type[Parseable], argv: Tuple[str, ...]) -> Parseable:
+    return parseable_type.from_args(list(argv), strict=False)
+
+
+def _from_args(
+    parseable_type: Type[Parseable], argv: Union[str, List[str]]
+) -> Parseable:
+    """ Parses an instance of `parseable_type` from `argv`, re-using the result of
+    previous parses with the same arguments (e.g. when a Method is created for each
+    trial of `hparam_sweep`).
+
+    Returns a copy, so the cached instance isn't modified. Only use this for types
+    that are plain values, like the hyper-parameters: the `__post_init__` and the
+    default factories of the cached instance aren't run again.
+    """
+    if isinstance(argv, str):
+        argv = shlex.split(argv)
+    return copy.deepcopy(_parse_args(parseable_type, tuple(argv)))
+
+
 @register_method
 @dataclass
 class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
@@ -136,9 +160,9 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
             # well from the argv that were used to create the Method.
             # Option 3: Parse them from the command-line.
             # assert not kwargs, "Don't pass any extra kwargs to the constructor!"
-            self.hparams = hparams or hparam_type.from_args(
-                self._argv, strict=False
-            )
+            self.hparams = hparams or _from_args(hparam_type, self._argv)
+            # NOTE: The Config and TrainerConfig are parsed again each time, since
+            # they seed the RNGs and look up the GPUs and directories when created.
             self.config = config or Config.from_args(self._argv, strict=False)
             self.trainer_options = trainer_options or TrainerConfig.from_args(
                 self._argv, strict=False
@@ -274,6 +298,22 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
             # Doing the backward pass manually, since there might not be a loss
             # at each step.
             self.trainer_options.automatic_optimization = False
+            if self.trainer_options.precision == 16:
+                warnings.warn(
+                    RuntimeWarning(
+                        "Mixed precision isn't supported when the output head does "
+                        "its own backward pass, using 32-bit precision instead."
+                    )
+                )
+                self.trainer_options.precision = 32
+
+        if self.trainer_options.precision is None:
+            # Use mixed precision by default when training on a GPU.
+            on_gpu = self.trainer_options.gpus and torch.cuda.is_available()
+            use_amp = on_gpu and getattr(
+                self.trainer_options, "automatic_optimization", True
+            )
+            self.trainer_options.precision = 16 if use_amp else 32
 
         self.trainer = self.create_trainer(setting)
         self.setting = setting
@@ -12,12 +12,11 @@ import tqdm
 from simple_parsing import ArgumentParser
 from torch import Tensor
 
-from sequoia.common.metrics import ClassificationMetrics
 from sequoia.methods import register_method
-from sequoia.settings import ClassIncrementalSetting, Setting
+from sequoia.settings import Setting
 from sequoia.settings.base import Actions, Environment, Method, Observations
 from sequoia.settings.sl import SLSetting
-from sequoia.utils import get_logger, singledispatchmethod
+from sequoia.utils import get_logger
 
 logger = get_logger(__file__)
 
@@ -131,6 +130,5 @@ class RandomBaselineMethod(Method, target_setting=Setting):
         return cls()
 
 
-
 if __name__ == "__main__":
     RandomBaselineMethod.main()
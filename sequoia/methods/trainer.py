@@ -1,7 +1,9 @@
 """ 'Patch' for the Trainer of Pytorch Lightning so it can use gym environment as
 dataloaders (via the GymDataLoader class of Sequoia).
 """
+import dataclasses
 import os
+from argparse import Namespace
 from dataclasses import dataclass
 from functools import singledispatch
 from pathlib import Path
@@ -14,7 +16,7 @@ from pytorch_lightning import Callback
 from pytorch_lightning import Trainer as _Trainer
 from pytorch_lightning.loggers import LightningLoggerBase
 from pytorch_lightning.utilities import rank_zero_warn
-from simple_parsing import choice, field
+from simple_parsing import field
 
 from sequoia.common import Batch
 from sequoia.common.config import Config
@@ -38,7 +40,9 @@ class TrainerConfig(HyperParameters, Parseable):
     of adding arguments in PL in addition to using simple-parsing.
     """
 
-    gpus: int = torch.cuda.device_count()
+    # NOTE: Using default factories so that CUDA isn't initialized and the working
+    # directory isn't read when this module is imported.
+    gpus: int = field(default_factory=torch.cuda.device_count)
     overfit_batches: float = 0.0
     fast_dev_run: bool = False
 
@@ -47,6 +51,9 @@ class TrainerConfig(HyperParameters, Parseable):
 
     # Number of nodes to use.
     num_nodes: int = 1
+    # Accelerator to use with more than one GPU. When None, pytorch-lightning picks one
+    # (e.g. 'ddp_spawn'). Using 'ddp' (one process per GPU) in SL can be faster, but
+    # each process then runs the whole script.
     accelerator: Optional[str] = None
     log_gpu_memory: bool = False
 
@@ -55,10 +62,14 @@ class TrainerConfig(HyperParameters, Parseable):
     auto_scale_batch_size: Optional[str] = None
     auto_lr_find: bool = False
     # Floating point precision to use in the model. (See pl.Trainer)
-    precision: int = choice(16, 32, default=32)
+    # When left to None, mixed (16-bit) precision is used when training on a GPU, and
+    # full (32-bit) precision is used otherwise.
+    precision: Optional[int] = None
 
-    default_root_dir: Path = Path(
-        os.environ.get("RESULTS_DIR", os.getcwd() + "/results")
+    default_root_dir: Path = field(
+        default_factory=lambda: Path(
+            os.environ.get("RESULTS_DIR", os.getcwd() + "/results")
+        )
     )
 
     # How much of training dataset to check (floats = percent, int = num_batches)
@@ -89,34 +100,26 @@ class TrainerConfig(HyperParameters, Parseable):
         from pytorch_lightning.trainer.connectors.data_connector import DataConnector
 
         setattr(pytorch_lightning.trainer.trainer, "DataConnector", DataConnector)
-        trainer = Trainer(
+        # NOTE: `from_argparse_args` only passes the fields of this config which are
+        # arguments of the Trainer's constructor, so they don't need to be listed here.
+        # TODO: Either move the log-dir-related stuff from Config to this class, or
+        # figure out a way to pass the value from Config to this function
+        trainer_kwargs = dataclasses.asdict(self)
+        if trainer_kwargs["precision"] is None:
+            # NOTE: The precision is usually set in `BaseMethod.configure`.
+            trainer_kwargs["precision"] = 32
+        trainer = Trainer.from_argparse_args(
+            Namespace(**trainer_kwargs),
             logger=loggers,
             callbacks=callbacks,
-            gpus=self.gpus,
-            num_nodes=self.num_nodes,
-            max_epochs=self.max_epochs,
-            accelerator=self.accelerator,
-            log_gpu_memory=self.log_gpu_memory,
-            overfit_batches=self.overfit_batches,
-            fast_dev_run=self.fast_dev_run,
-            auto_scale_batch_size=self.auto_scale_batch_size,
-            auto_lr_find=self.auto_lr_find,
-            # TODO: Either move the log-dir-related stuff from Config to this
-            # class, or figure out a way to pass the value from Config to this
-            # function
-            default_root_dir=self.default_root_dir,
-            limit_train_batches=self.limit_train_batches,
-            limit_val_batches=self.limit_val_batches,
-            limit_test_batches=self.limit_train_batches,
-            checkpoint_callback=self.checkpoint_callback,
             profiler=None,  # TODO: Seem to have an impact on the problem below.
         )
         return trainer
 
 
 class Trainer(_Trainer):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+    # NOTE: Not overriding `__init__`, since `from_argparse_args` uses its signature to
+    # find which arguments to pass.
 
     def fit(self, model, train_dataloader=None, val_dataloaders=None, datamodule=None):
         # TODO: Figure out what method to overwrite to fix the problem of accessing two
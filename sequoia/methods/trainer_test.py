@@ -0,0 +1,20 @@
+from sequoia.common.config import Config
+
+from .trainer import TrainerConfig
+
+
+def test_limit_test_batches_is_passed_to_trainer(config: Config, tmp_path):
+    """ Regression test: `make_trainer` used to pass `limit_train_batches` as the
+    value of `limit_test_batches`.
+    """
+    trainer_config = TrainerConfig(
+        gpus=0,
+        default_root_dir=tmp_path,
+        limit_train_batches=1.0,
+        limit_val_batches=0.5,
+        limit_test_batches=0.1,
+    )
+    trainer = trainer_config.make_trainer(config=config)
+    assert trainer.limit_train_batches == 1.0
+    assert trainer.limit_val_batches == 0.5
+    assert trainer.limit_test_batches == 0.1
@@ -46,9 +46,11 @@ class Categorical(Categorical_):
         """
         return self._device
 
-    def to(self, device: Union[str, torch.device]) -> "Categorical":
+    def to(self, *args, **kwargs) -> "Categorical":
         """ Moves this distribution to another device. 
         
         @lebrice: Not sure why this isn't already part of torch.Distribution base-class. 
+
+        The arguments are passed to `Tensor.to` (e.g. `device`, `non_blocking`).
         """
-        return type(self)(logits=self.logits.to(device=device))
+        return type(self)(logits=self.logits.to(*args, **kwargs))
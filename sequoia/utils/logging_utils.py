@@ -134,25 +134,29 @@ def cleanup(message: Dict[str, Union[Dict, str, float, Any]],
             continue
 
         v = message.pop(k)
-        # Example input:
-        # "Task_losses/Task1/losses/Test/losses/rotate/losses/270/metrics/270/accuracy"
-        # Simplify the key, by getting rid of all the '/losses/' and '/metrics/' etc.
-        things_to_remove: List[str] = [f"{sep}losses{sep}", f"{sep}metrics{sep}"]
-        for thing in things_to_remove:
-            while thing in k:
-                k = k.replace(thing, sep)
-        # --> "Task_losses/Task1/Test/rotate/270/270/accuracy"
-
-        # Get rid of repetitive modifiers (ex: "/270/270" above)
-        parts = k.split(sep)
-        parts = [s for s in parts if not s.isspace()]
-        k = sep.join(unique_consecutive(parts))
-        # Will become:
-        # "Task_losses/Task1/Test/rotate/270/accuracy"
-        message[k] = v
+        message[simplify_key(k, sep=sep)] = v
     return message
 
 
+def simplify_key(key: str, sep: str = "/") -> str:
+    """ Simplifies a key of a flattened message dict (see `cleanup`). """
+    # Example input:
+    # "Task_losses/Task1/losses/Test/losses/rotate/losses/270/metrics/270/accuracy"
+    # Simplify the key, by getting rid of all the '/losses/' and '/metrics/' etc.
+    things_to_remove: List[str] = [f"{sep}losses{sep}", f"{sep}metrics{sep}"]
+    for thing in things_to_remove:
+        while thing in key:
+            key = key.replace(thing, sep)
+    # --> "Task_losses/Task1/Test/rotate/270/270/accuracy"
+
+    # Get rid of repetitive modifiers (ex: "/270/270" above)
+    parts = key.split(sep)
+    parts = [s for s in parts if not s.isspace()]
+    return sep.join(unique_consecutive(parts))
+    # Will become:
+    # "Task_losses/Task1/Test/rotate/270/accuracy"
+
+
 class TqdmLoggingHandler(logging.Handler):
     def __init__(self, level=logging.NOTSET):
         super().__init__(level)